@@ -2,30 +2,73 @@
 Authentication API Routes
 """
 import logging
-from fastapi import APIRouter, HTTPException, status, Request
+from typing import Any, Dict, Type, TypeVar
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
 from fastapi.responses import JSONResponse
 from app.schemas.user import UserSignup, UserResponse, UserLogin, LoginResponse
-from app.services.auth_service import register_user, login_user
-from app.models.user import User
+from app.services.auth_service import register_user, login_user, user_to_response
 from app.utils.security import create_access_token
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
-def user_to_response(user: User) -> UserResponse:
-    """Convert User document to UserResponse schema"""
-    import json
-    user_json = user.model_dump_json(exclude={"hashed_password"})
-    user_dict = json.loads(user_json)
-    user_dict["id"] = str(user.id)
-    user_dict.pop("_id", None)
-    return UserResponse.model_validate(user_dict)
+
+def json_body(model: Type[ModelT]):
+    """
+    Dependency that validates the raw request bytes with model_validate_json, so the
+    body is parsed and validated in one pass instead of json -> dict -> model.
+    Errors are re-raised as RequestValidationError to keep the usual 422 shape.
+    """
+    async def dependency(request: Request) -> ModelT:
+        raw = await request.body()
+        try:
+            return model.model_validate_json(raw)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+            )
+    return dependency
+
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    """Replace local "#/$defs/..." references with the definitions they point to"""
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/$defs/"):
+            return _inline_refs(defs[ref[len("#/$defs/"):]], defs)
+        return {key: _inline_refs(value, defs) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(item, defs) for item in node]
+    return node
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    openapi_extra documenting a json_body(model) request body, which FastAPI can't
+    see through the dependency. Nested definitions are inlined so the schema is
+    self-contained in the OpenAPI document.
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": _inline_refs(schema, defs)}},
+            "required": True,
+        }
+    }
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserSignup):
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=json_body_openapi(UserSignup),
+)
+async def register(user_data: UserSignup = Depends(json_body(UserSignup))):
     """
     User registration endpoint
     
@@ -50,8 +93,8 @@ async def register(user_data: UserSignup):
         )
 
 
-@router.post("/login", response_model=LoginResponse)
-async def login(credentials: UserLogin):
+@router.post("/login", response_model=LoginResponse, openapi_extra=json_body_openapi(UserLogin))
+async def login(credentials: UserLogin = Depends(json_body(UserLogin))):
     """
     User login endpoint
     
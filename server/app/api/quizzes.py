@@ -7,12 +7,14 @@ from app.models.user import User
 from app.models.cognitive_load.quiz import Quiz, QuizResult
 from app.schemas.cognitive_load.quiz import (
     QuizGenerateRequest,
+    QuizBulkGenerateRequest,
     QuizSubmitRequest,
     QuizResponse,
     QuizResultResponse
 )
 from app.services.cognitive_load.quiz_generator import (
     generate_quiz_for_lesson,
+    bulk_generate_quizzes,
     get_quiz as get_quiz_service,
     submit_quiz_answers,
     get_quiz_result
@@ -110,6 +112,39 @@ async def generate_quiz(
         )
 
 
+@router.post("/generate/bulk", response_model=List[QuizResponse], status_code=status.HTTP_201_CREATED)
+async def generate_quizzes_bulk(
+    request: QuizBulkGenerateRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generate quizzes for several lessons
+    
+    Creates one 10-question quiz per lesson, stored in a single batch write.
+    """
+    try:
+        lesson_ids = [PydanticObjectId(lesson_id) for lesson_id in request.lesson_ids]
+        user_id = PydanticObjectId(current_user.id)
+        
+        quizzes = await bulk_generate_quizzes(
+            lesson_ids=lesson_ids,
+            user_id=user_id,
+            num_questions=10
+        )
+        
+        return [quiz_to_response(quiz) for quiz in quizzes]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating quizzes: {str(e)}"
+        )
+
+
 @router.get("/{quiz_id}", response_model=QuizResponse)
 async def get_quiz(
     quiz_id: str,
@@ -163,17 +198,14 @@ async def submit_quiz(
         if request_body.behavior_data:
             behavior_data = request_body.behavior_data.model_dump()
         
-        # Convert cognitive load features if provided
-        cognitive_load_features = None
-        if request_body.cognitive_load_features:
-            cognitive_load_features = request_body.cognitive_load_features.model_dump()
-        
+        # Cognitive load features are passed as the schema itself; the predictor
+        # reads them by attribute
         result = await submit_quiz_answers(
             quiz_id=quiz_obj_id,
             user_id=user_id,
             answers=answers_dict,
             behavior_data=behavior_data,
-            cognitive_load_features=cognitive_load_features
+            cognitive_load_features=request_body.cognitive_load_features
         )
         
         return await quiz_result_to_response(result)
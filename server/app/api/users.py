@@ -3,23 +3,13 @@ User Management API Routes
 """
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.schemas.user import UserResponse, UserUpdate
-from app.services.auth_service import update_user
+from app.services.auth_service import update_user, user_to_response
 from app.models.user import User
 from app.utils.dependencies import get_current_user
 
 router = APIRouter()
 
 
-def user_to_response(user: User) -> UserResponse:
-    """Convert User document to UserResponse schema"""
-    import json
-    user_json = user.model_dump_json(exclude={"hashed_password"})
-    user_dict = json.loads(user_json)
-    user_dict["id"] = str(user.id)
-    user_dict.pop("_id", None)
-    return UserResponse.model_validate(user_dict)
-
-
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
     current_user: User = Depends(get_current_user)
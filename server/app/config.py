@@ -69,6 +69,13 @@ class Settings(BaseSettings):
 
     # Quiz generation loads spaCy + SentenceTransformer (high RAM). Set false on small hosts if /api/quizzes/generate returns 502.
     QUIZ_USE_ML: bool = True
+    # spaCy is only used for quiz concept extraction (rule-based fallback otherwise). Set false to save its RAM and load time.
+    QUIZ_USE_SPACY: bool = True
+    # Quiz distractor encoder: "torch" or "onnx" (int8 ONNX Runtime, needs sentence-transformers[onnx]; falls back to torch).
+    QUIZ_ENCODER_BACKEND: str = "torch"
+    # SQLite file caching generated quizzes by (lesson content, load, ML settings). Empty = off;
+    # when set, regenerating a quiz for unchanged content returns the same questions.
+    QUIZ_CACHE_PATH: str = ""
 
     # Visual Learning Platform (animation script generation) – Gemini
     # Accepts GEMINI_API_KEY or Gemini_API_Key from .env
@@ -5,7 +5,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.config import settings
 from app.database import connect_to_mongo, close_mongo_connection
@@ -33,6 +33,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    # Routes returning dicts/models are encoded with orjson instead of stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # CORS Middleware
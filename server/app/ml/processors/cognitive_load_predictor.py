@@ -9,14 +9,18 @@ to estimate load levels (Low / Medium / High) for adaptation and potential arous
 (Yerkes–Dodson).
 """
 import json
+import threading
 import warnings
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional, Tuple, Any
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Tuple, Union
 from pathlib import Path
 from app.config import settings
 
+if TYPE_CHECKING:
+    from app.schemas.cognitive_load.quiz import CognitiveLoadFeaturesSchema
+
 # Resolve model dir relative to project root (server/) so it works regardless of CWD
 # __file__ = server/app/ml/processors/cognitive_load_predictor.py -> parent^4 = server
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
@@ -41,12 +45,25 @@ except ImportError:
     InconsistentVersionWarning = type("InconsistentVersionWarning", (UserWarning,), {})
 
 
+# Features as a dict, or the CognitiveLoadFeaturesSchema request model (read by
+# attribute) so callers needn't model_dump() first
+Features = Union[Mapping[str, float], "CognitiveLoadFeaturesSchema"]
+
+
+def _feature_getter(features: Features) -> Callable[[str, float], Any]:
+    """Return a (name, default) -> value lookup for either form of features"""
+    if isinstance(features, Mapping):
+        return features.get
+    return lambda name, default: getattr(features, name, default)
+
+
 class CognitiveLoadPredictor:
     """Predict cognitive load from behavioral features"""
 
     def __init__(self):
         self.model: Any = None
-        self.feature_order: Optional[list] = None
+        self.feature_order: Optional[Tuple[str, ...]] = None
+        self._feature_columns: Optional[pd.Index] = None  # DataFrame columns, built once
         self._model_kind: str = "none"  # "keras" | "sklearn" | "none"
         self._sklearn_classes: Optional[list] = None  # class order for predict_proba
         self.load_model()
@@ -57,7 +74,8 @@ class CognitiveLoadPredictor:
         if features_path.exists():
             try:
                 with open(features_path, "r", encoding="utf-8") as f:
-                    self.feature_order = json.load(f)
+                    self.feature_order = tuple(json.load(f))
+                self._feature_columns = pd.Index(self.feature_order)
                 print(f"✅ Loaded feature order from '{features_path.name}'")
             except Exception as e:
                 print(f"⚠️  Could not load feature order: {e}. Will use fallback heuristic.")
@@ -114,7 +132,7 @@ class CognitiveLoadPredictor:
         if self.model is None:
             print("⚠️  No model loaded. Will use fallback heuristic for cognitive load prediction.")
     
-    def _predict_fallback(self, features: Dict[str, float]) -> Tuple[str, float, Dict[str, float]]:
+    def _predict_fallback(self, features: Features) -> Tuple[str, float, Dict[str, float]]:
         """
         Fallback heuristic-based prediction when model is not available.
 
@@ -123,18 +141,19 @@ class CognitiveLoadPredictor:
         variability. We do not measure brain activity.
         
         Args:
-            features: Dictionary of feature names and values
+            features: Feature names and values, as a dict or attributes
             
         Returns:
             Tuple of (predicted_load, confidence, confidence_scores)
         """
         # Extract key features
-        accuracy_rate = features.get('accuracyRate', 0.5)
-        errors = features.get('errors', 0.0)
-        answer_changes = features.get('answerChanges', 0.0)
-        error_streak = features.get('currentErrorStreak', 0.0)
-        response_variability = features.get('responseTimeVariability', 0.0)
-        idle_gaps = features.get('idleGapsOverThreshold', 0.0)
+        get = _feature_getter(features)
+        accuracy_rate = get('accuracyRate', 0.5)
+        errors = get('errors', 0.0)
+        answer_changes = get('answerChanges', 0.0)
+        error_streak = get('currentErrorStreak', 0.0)
+        response_variability = get('responseTimeVariability', 0.0)
+        idle_gaps = get('idleGapsOverThreshold', 0.0)
         
         # Calculate a cognitive load score (0-100, higher = more load)
         load_score = 0.0
@@ -177,7 +196,7 @@ class CognitiveLoadPredictor:
         
         return predicted_load, confidence, confidence_scores
     
-    def predict(self, features: Dict[str, float]) -> Tuple[str, float, Dict[str, float]]:
+    def predict(self, features: Features) -> Tuple[str, float, Dict[str, float]]:
         """
         Predict cognitive load from features
 
@@ -191,17 +210,18 @@ class CognitiveLoadPredictor:
             return self._predict_fallback(features)
 
         try:
-            feature_array = [
-                float(features.get(name, 0.0)) for name in self.feature_order
-            ]
+            get = _feature_getter(features)
+            X = np.fromiter(
+                (float(get(name, 0.0)) for name in self.feature_order),
+                dtype=np.float64,
+                count=len(self.feature_order),
+            ).reshape(1, -1)
 
             if self._model_kind == "sklearn":
                 # Pass DataFrame with feature names so sklearn doesn't warn and column order is explicit
-                X = pd.DataFrame(
-                    [feature_array],
-                    columns=list(self.feature_order),
-                )
-                probabilities = self.model.predict_proba(X)[0]
+                probabilities = self.model.predict_proba(
+                    pd.DataFrame(X, columns=self._feature_columns, copy=False)
+                )[0]
                 # Avoid "truth value of array is ambiguous": don't use (array or default)
                 if self._sklearn_classes is None:
                     classes = ["Low", "Medium", "High"]
@@ -221,7 +241,6 @@ class CognitiveLoadPredictor:
                 return predicted_load, confidence, confidence_scores
 
             # Keras: numpy input
-            X = np.array(feature_array).reshape(1, -1)
             probabilities = self.model.predict(X, verbose=0)[0]
             load_mapping = {0: "Low", 1: "Medium", 2: "High"}
             predicted_class = int(np.argmax(probabilities))
@@ -245,24 +264,28 @@ class CognitiveLoadPredictor:
         )
 
 
-# Global predictor instance
+# Global predictor instance. Quiz submissions reach it from asyncio.to_thread workers,
+# so the first load is serialized by the lock.
 _predictor_instance: Optional[CognitiveLoadPredictor] = None
+_predictor_lock = threading.Lock()
 
 
 def get_predictor() -> CognitiveLoadPredictor:
     """Get or create the global predictor instance"""
     global _predictor_instance
     if _predictor_instance is None:
-        _predictor_instance = CognitiveLoadPredictor()
+        with _predictor_lock:
+            if _predictor_instance is None:
+                _predictor_instance = CognitiveLoadPredictor()
     return _predictor_instance
 
 
-def predict_cognitive_load(features: Dict[str, float]) -> Tuple[str, float, Dict[str, float]]:
+def predict_cognitive_load(features: Features) -> Tuple[str, float, Dict[str, float]]:
     """
     Main function to predict cognitive load from features
     
     Args:
-        features: Dictionary of feature names and values
+        features: Feature names and values, as a dict or an object with attributes
         
     Returns:
         Tuple of (predicted_load, confidence, confidence_scores)
@@ -11,31 +11,360 @@ Key improvements over previous version:
 - Load-aware: question complexity, distractor difficulty, and phrasing all scale with cognitive load
 """
 
+import os
 import re
 import random
 import uuid
 import logging
+import hashlib
+import heapq
+import itertools
 import threading
-from typing import List, Dict, Optional, Set
-from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Set
+from collections import Counter, OrderedDict
 
 SPACY_AVAILABLE = False
 SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 import numpy as np
 
+from app.ml.utils import get_spacy_nlp
+
 logger = logging.getLogger(__name__)
 
-# One shared QuizGenerator per use_ml flag — avoids reloading SentenceTransformer/spaCy on every request (OOM/502 on Render).
+_STOPWORDS = frozenset({
+    'the', 'this', 'that', 'with', 'from', 'when', 'what',
+    'where', 'which', 'there', 'their', 'these', 'those',
+    'have', 'has', 'had', 'will', 'would', 'could', 'should',
+    'more', 'most', 'very', 'also', 'just', 'only', 'about',
+    'some', 'such', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'between', 'under', 'again',
+    'each', 'other', 'being', 'been', 'both', 'same'
+})
+
+_BAD_SUBJECT_STARTS = (
+    'the ', 'a ', 'an ', 'this ', 'that ',
+    'in ', 'on ', 'at ', 'by ', 'for ', 'of ', 'to ', 'from '
+)
+_BAD_SUBJECT_ENDS = (' and', ' or', ' but', ' of', ' in', ' on', ' at')
+
+_FRAGMENT_HEADS = frozenset({
+    'a byproduct', 'the byproduct', 'a result', 'the result',
+    'an example', 'the example', 'a type', 'the type'
+})
+_FRAGMENT_PREFIXES = tuple(f'{head} of' for head in _FRAGMENT_HEADS)
+
+# Domain-adjacent swaps used to build plausible-but-wrong paraphrases
+_PARAPHRASE_SWAPS = {
+    'light': ('chemical', 'thermal', 'mechanical', 'electrical'),
+    'chemical': ('light', 'thermal', 'kinetic', 'electrical'),
+    'energy': ('matter', 'mass', 'heat', 'force'),
+    'carbon dioxide': ('oxygen', 'nitrogen', 'water vapour', 'hydrogen'),
+    'oxygen': ('carbon dioxide', 'nitrogen', 'glucose', 'water'),
+    'glucose': ('starch', 'cellulose', 'fructose', 'sucrose'),
+    'water': ('carbon dioxide', 'oxygen', 'glucose', 'minerals'),
+    'chlorophyll': ('carotenoids', 'anthocyanins', 'xanthophylls', 'cytochromes'),
+    'chloroplasts': ('mitochondria', 'ribosomes', 'vacuoles', 'nuclei'),
+    'plants': ('animals', 'fungi', 'bacteria', 'archaea'),
+    'sunlight': ('chemical energy', 'thermal energy', 'electrical energy'),
+    'synthesis': ('breakdown', 'hydrolysis', 'oxidation', 'reduction'),
+    'convert': ('store', 'release', 'absorb', 'reflect'),
+    'absorb': ('reflect', 'transmit', 'emit', 'store'),
+    'release': ('absorb', 'store', 'convert', 'produce'),
+}
+
+_PARAPHRASE_SWAP_RES = {key: re.compile(re.escape(key), re.IGNORECASE) for key in _PARAPHRASE_SWAPS}
+
+_PARAPHRASE_NEGATIONS = tuple(
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in (
+        (r'\bconvert\b', 'store rather than convert'),
+        (r'\babsorb\b', 'reflect rather than absorb'),
+        (r'\brelease\b', 'consume rather than release'),
+        (r'\bproduce\b', 'consume rather than produce'),
+        (r'\bsynthesiz', 'break down rather than synthesize'),
+    )
+)
+
+_IDEAL_SIMILARITY = {'OVERLOAD': 0.25, 'LOW': 0.70, 'OPTIMAL': 0.50}
+
+_LOADS = frozenset({'OVERLOAD', 'OPTIMAL', 'LOW'})
+
+_TEMPLATES: Dict[str, Dict[str, List[str]]] = {
+    'OVERLOAD': {
+        'definition': [
+            'What is {concept}?',
+            'What does {concept} mean?',
+        ],
+        'property': [
+            'What is true about {concept}?',
+            'Which fact about {concept} is correct?',
+        ],
+        'general': [
+            'According to the lesson, what is {concept}?',
+        ]
+    },
+    'LOW': {
+        'definition': [
+            'Which of the following best explains {concept}?',
+            'What is the most accurate definition of {concept}?',
+            'How would you describe {concept} based on the lesson?',
+        ],
+        'property': [
+            'Which statement best describes a key characteristic of {concept}?',
+            'What can be concluded about {concept} from the lesson?',
+            'Which explanation of {concept} is most accurate?',
+        ],
+        'general': [
+            'What conclusion can be drawn about {concept}?',
+            'Which statement best summarises the role of {concept}?',
+        ]
+    },
+    'OPTIMAL': {
+        'definition': [
+            'What is {concept}?',
+            'Which of the following best describes {concept}?',
+            'According to the lesson, what is {concept}?',
+        ],
+        'property': [
+            'Which statement about {concept} is correct?',
+            'What is true about {concept} according to the lesson?',
+            'Which best describes a characteristic of {concept}?',
+        ],
+        'general': [
+            'What does the lesson say about {concept}?',
+            'According to the text, what is a key fact about {concept}?',
+        ]
+    },
+}
+
+# Fact type codes for the columnar fact table (index into _FACT_TYPE_NAMES)
+_FACT_DEFINITION, _FACT_PROPERTY = 0, 1
+_FACT_TYPE_NAMES = ('definition', 'property')
+_FACT_TYPE_CODES = {name: code for code, name in enumerate(_FACT_TYPE_NAMES)}
+
+_LOWER_WORD_RE = re.compile(r'\b([a-z]{4,})\b')
+
+# Patterns used per sentence / per candidate, compiled once at import
+# A whitespace run, plus any punctuation right after it: collapsed to one
+# space, or dropped before the punctuation, in a single pass (see _collapse_whitespace)
+_WHITESPACE_RE = re.compile(r'\s+([.,!?])?')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_HAS_LETTER_RE = re.compile(r'[a-zA-Z]')
+_LEADING_ARTICLE_RE = re.compile(r'^(?:the|a|an)\s+', re.IGNORECASE)
+_CAPITALISED_TERM_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3}\b')
+_QUOTED_TERM_RE = re.compile(r'["\']([^"\']{3,40})["\']')
+_DEFINED_TERM_RE = re.compile(r'\b([A-Z][a-zA-Z\s]{2,35}?)\s+(?:is|are)\s+(?:a|an|the)\s+')
+_DEFINITION_FACT_RE = re.compile(
+    r'^([A-Z][a-zA-Z]+(?:\s+[A-Z]?[a-z]+){0,4})\s+(is|are)\s+(.+?)(?:\.\s*$|$)'
+)
+_PROPERTY_FACT_RE = re.compile(
+    r'([A-Z][a-zA-Z\s]{2,35}?)\s+(has|have|includes|contains|consists of)\s+(.+?)(?:\.|$)'
+)
+# Literal verbs each fact pattern needs. Sentences come out of clean_text with single
+# spaces, so a plain substring test rules out most sentences before the regex runs.
+_DEFINITION_VERBS = (' is ', ' are ')
+_PROPERTY_VERBS = (' has ', ' have ', ' includes ', ' contains ', ' consists of ')
+_DANGLING_END_RE = re.compile(r'\b(?:and|or|but|of|in|on|at)\s*\?$')
+
+_SPACY_ENTITY_LABELS = frozenset({'PERSON', 'ORG', 'GPE', 'EVENT', 'PRODUCT', 'LOC', 'FAC'})
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    """_WHITESPACE_RE replacement: the punctuation after the run if matched, else one space"""
+    return match.group(1) or ' '
+
+
+@dataclass
+class _FactTable:
+    """
+    Column-oriented view of extracted facts: one list per field, sharing an index.
+    Question assembly walks these parallel lists instead of hashing into a dict per fact.
+    """
+    types: List[int] = field(default_factory=list)
+    subjects: List[str] = field(default_factory=list)
+    predicates: List[str] = field(default_factory=list)
+    sentences: List[str] = field(default_factory=list)
+    # Derived once at build time; the distractor pool compares against these for every
+    # (question, fact) pair, so they must not be re-lowered per comparison.
+    subjects_lower: List[str] = field(default_factory=list)
+    answers: List[str] = field(default_factory=list)  # predicate as offered as a distractor
+    answers_lower: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_facts(cls, facts: List[Dict]) -> "_FactTable":
+        table = cls()
+        for fact in facts:
+            answer = fact['predicate'].strip().rstrip('.')
+            table.types.append(_FACT_TYPE_CODES.get(fact['type'], _FACT_DEFINITION))
+            table.subjects.append(fact['subject'])
+            table.predicates.append(fact['predicate'])
+            table.sentences.append(fact['sentence'])
+            table.subjects_lower.append(fact['subject'].lower())
+            table.answers.append(answer)
+            table.answers_lower.append(answer.lower())
+        return table
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+
+@dataclass
+class _EmbeddingCache:
+    """
+    Per-quiz view over a lesson's text → embedding map. The first lookup that has to
+    encode calls `seed` for the texts the remaining MCQs are likely to rank and encodes
+    them together with the request in one forward pass, so later questions — and later
+    quizzes on the same lesson — are served from memory instead of re-running the encoder.
+    The seed is only built once an encoder is actually in use.
+    """
+    vectors: Dict[str, np.ndarray] = field(default_factory=dict)
+    seed: Optional[Callable[[], List[str]]] = None
+
+
+def _cpu_has_vnni() -> bool:
+    """True when the CPU advertises AVX512-VNNI / AVX-VNNI (the int8 dot-product units)."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_vnni' in flags or 'avx_vnni' in flags
+
+
+# Past ~8 threads a MiniLM-sized forward pass loses more to contention than it gains
+_MAX_ENCODER_THREADS = 8
+_torch_configured = False
+
+
+def _available_cpus() -> int:
+    """CPUs this process may really use: scheduler affinity and the cgroup v2 quota, not the host total."""
+    try:
+        n = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        n = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            n = min(n, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, n)
+
+
+def _encoder_threads() -> int:
+    return min(_MAX_ENCODER_THREADS, _available_cpus())
+
+
+def _configure_torch_threads() -> None:
+    """
+    Size torch's intra-/inter-op pools once per process, before the first model runs.
+    An explicit OMP_NUM_THREADS from the deployment is left alone.
+    """
+    global _torch_configured
+    if _torch_configured:
+        return
+    _torch_configured = True
+    if os.environ.get('OMP_NUM_THREADS'):
+        return
+    try:
+        import torch
+        n = _encoder_threads()
+        torch.set_num_threads(n)
+        try:
+            torch.set_num_interop_threads(max(1, n // 4))
+        except RuntimeError:
+            pass  # only settable before any inter-op work has run in this process
+    except Exception as e:
+        logger.warning(f"torch thread setup skipped: {e}")
+
+
+def _prepare_encoder(model) -> None:
+    """
+    Precision tuning for the sentence encoder, by device:
+    - CUDA: cast weights to fp16; short quiz texts are bandwidth-bound, and ranking is
+      insensitive to the precision loss.
+    - CPU: swap the Linear layers for dynamic int8 ones, but only when a quantized x86
+      engine and VNNI are present; without them int8 matmuls can end up slower than
+      fp32, so the model is left as-is.
+    """
+    try:
+        import torch
+
+        if model.device.type == 'cuda':
+            model.half()
+            logger.info("✅ SentenceTransformer running in fp16 on CUDA")
+            return
+        if model.device.type != 'cpu':
+            return
+
+        engine = next(
+            (e for e in ('x86', 'fbgemm') if e in torch.backends.quantized.supported_engines),
+            None
+        )
+        if engine is None or not _cpu_has_vnni():
+            return
+        torch.backends.quantized.engine = engine
+        model[0].auto_model = torch.quantization.quantize_dynamic(
+            model[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info(f"✅ SentenceTransformer quantized to int8 ({engine})")
+    except Exception as e:
+        logger.warning(f"SentenceTransformer precision tuning skipped: {e}")
+
+
+# Question IDs only need to be unique, not unpredictable: a random per-process prefix
+# plus a counter replaces an os.urandom read and UUID formatting per question.
+_question_id_prefix = ''
+_question_id_counter = itertools.count()
+
+
+def _reset_question_ids() -> None:
+    global _question_id_prefix, _question_id_counter
+    _question_id_prefix = f"{os.getpid():x}-{uuid.uuid4().hex[:8]}-"
+    _question_id_counter = itertools.count()
+
+
+_reset_question_ids()
+# Forked workers (gunicorn/uvicorn --workers) must not share the parent's sequence
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_question_ids)
+
+
+def _next_question_id() -> str:
+    return f"{_question_id_prefix}{next(_question_id_counter):x}"
+
+
+# Highest-scoring facts kept per lesson (see extract_facts)
+_MAX_FACTS = 40
+
+# Parsed lessons kept per generator; retakes and "new quiz" re-send the same text
+_LESSON_CACHE_SIZE = 128
+
+_ENCODER_MODEL = "all-MiniLM-L6-v2"
+# Pre-quantized int8 export published alongside the model (needs sentence-transformers[onnx])
+_ENCODER_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+# One shared QuizGenerator per configuration — avoids reloading SentenceTransformer/spaCy on every request (OOM/502 on Render).
 _quiz_generator_lock = threading.Lock()
-_quiz_generator_instances: Dict[bool, "QuizGenerator"] = {}
+_quiz_generator_instances: Dict[tuple, "QuizGenerator"] = {}
 
 
-def _get_quiz_generator(use_ml: bool) -> "QuizGenerator":
+def _get_quiz_generator(
+    use_ml: bool,
+    use_spacy: bool = True,
+    encoder_backend: str = 'torch'
+) -> "QuizGenerator":
+    key = (use_ml, use_spacy, encoder_backend)
     with _quiz_generator_lock:
-        if use_ml not in _quiz_generator_instances:
-            _quiz_generator_instances[use_ml] = QuizGenerator(use_ml=use_ml)
-        return _quiz_generator_instances[use_ml]
+        if key not in _quiz_generator_instances:
+            _quiz_generator_instances[key] = QuizGenerator(
+                use_ml=use_ml, use_spacy=use_spacy, encoder_backend=encoder_backend
+            )
+        return _quiz_generator_instances[key]
 
 
 class QuizGenerator:
@@ -50,20 +379,24 @@ class QuizGenerator:
     ─────────────────────────────────────────────────────
     """
 
-    def __init__(self, use_ml: bool = True):
+    def __init__(self, use_ml: bool = True, use_spacy: bool = True, encoder_backend: str = 'torch'):
         self.use_ml = use_ml
+        self.use_spacy = use_spacy
+        self.encoder_backend = (encoder_backend or 'torch').strip().lower()
         self.spacy_nlp = None
         self.distilbert_model = None
-
-        self.stopwords = {
-            'the', 'this', 'that', 'with', 'from', 'when', 'what',
-            'where', 'which', 'there', 'their', 'these', 'those',
-            'have', 'has', 'had', 'will', 'would', 'could', 'should',
-            'more', 'most', 'very', 'also', 'just', 'only', 'about',
-            'some', 'such', 'into', 'through', 'during', 'before',
-            'after', 'above', 'below', 'between', 'under', 'again',
-            'each', 'other', 'being', 'been', 'both', 'same'
-        }
+        # The sentence encoder only ranks distractors, so it is loaded on first use
+        # rather than with the generator (see _get_encoder).
+        self._encoder_loaded = not use_ml
+        self._encoder_lock = threading.Lock()
+        self._lesson_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lesson_cache_lock = threading.Lock()
+
+        self.stopwords = _STOPWORDS
+        # spaCy attribute ids (POS, LENGTH) and the NOUN symbol for the array-based noun
+        # filter; resolved alongside the lazy spaCy load so importing this module stays cheap
+        self._noun_filter_attrs: tuple = ()
+        self._noun_pos: int = 0
 
         if self.use_ml:
             self._initialize_ml_components()
@@ -73,24 +406,64 @@ class QuizGenerator:
     # ──────────────────────────────────────────────────────────────────────────
 
     def _initialize_ml_components(self):
-        global SPACY_AVAILABLE, SENTENCE_TRANSFORMERS_AVAILABLE
+        global SPACY_AVAILABLE
+
+        # spaCy only feeds concept extraction; without it the rule-based extractor is used
+        if not self.use_spacy:
+            return
 
         try:
-            import spacy
-            SPACY_AVAILABLE = True
-            try:
-                self.spacy_nlp = spacy.load("en_core_web_sm")
-                logger.info("✅ spaCy loaded")
-            except OSError:
-                self.spacy_nlp = None
+            # Shared with the adaptive text engine - one model instance per process
+            self.spacy_nlp = get_spacy_nlp()
+            SPACY_AVAILABLE = self.spacy_nlp is not None
+            if SPACY_AVAILABLE:
+                from spacy.attrs import POS, LENGTH
+                from spacy.symbols import NOUN
+                self._noun_filter_attrs = (POS, LENGTH)
+                self._noun_pos = NOUN
         except Exception:
             self.spacy_nlp = None
 
+    def _get_encoder(self):
+        """Return the SentenceTransformer, loading it the first time ranking needs it."""
+        if not self._encoder_loaded:
+            with self._encoder_lock:
+                if not self._encoder_loaded:
+                    self._load_encoder()
+                    self._encoder_loaded = True
+        return self.distilbert_model
+
+    def _load_encoder(self):
+        global SENTENCE_TRANSFORMERS_AVAILABLE
+
         try:
             from sentence_transformers import SentenceTransformer
             SENTENCE_TRANSFORMERS_AVAILABLE = True
             try:
-                self.distilbert_model = SentenceTransformer("all-MiniLM-L6-v2")
+                _configure_torch_threads()
+                model = None
+                if self.encoder_backend == 'onnx':
+                    try:
+                        import onnxruntime
+
+                        session_options = onnxruntime.SessionOptions()
+                        session_options.intra_op_num_threads = _encoder_threads()
+                        model = SentenceTransformer(
+                            _ENCODER_MODEL,
+                            backend='onnx',
+                            model_kwargs={
+                                'file_name': _ENCODER_ONNX_FILE,
+                                'session_options': session_options,
+                            },
+                        )
+                    except Exception as e:
+                        logger.warning(f"ONNX encoder unavailable, using torch: {e}")
+                if model is None:
+                    model = SentenceTransformer(_ENCODER_MODEL)
+                    _prepare_encoder(model)
+                # Pay tokenizer / kernel cold-start once here, not on the first ranked question
+                self._encode(model, ["warmup sentence"])
+                self.distilbert_model = model
                 logger.info("✅ SentenceTransformer loaded")
             except Exception:
                 self.distilbert_model = None
@@ -102,43 +475,50 @@ class QuizGenerator:
     # ──────────────────────────────────────────────────────────────────────────
 
     def clean_text(self, text: str) -> str:
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\s+([.,!?])', r'\1', text)
-        return text.strip()
+        return _WHITESPACE_RE.sub(_collapse_whitespace, text).strip()
 
     def split_sentences(self, text: str) -> List[str]:
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        clean = []
-        for sent in sentences:
-            sent = self.clean_text(sent)
-            if (
-                len(sent) >= 40
-                and len(sent.split()) >= 7
-                and sent[0].isupper()
-                and sent[-1] in '.!?'
-            ):
-                clean.append(sent)
-        return clean
+        return list(self.iter_sentences(text))
+
+    def iter_sentences(self, text: str) -> Iterator[str]:
+        """
+        Lazily yield the cleaned, usable sentences of `text`. Walks the sentence
+        boundaries with finditer instead of materialising every raw piece up front,
+        most of which the length/shape filters below throw away.
+        """
+        start = 0
+        for boundary in _SENTENCE_SPLIT_RE.finditer(text):
+            sent = self._usable_sentence(text[start:boundary.start()])
+            if sent:
+                yield sent
+            start = boundary.end()
+        sent = self._usable_sentence(text[start:])
+        if sent:
+            yield sent
+
+    def _usable_sentence(self, raw: str) -> Optional[str]:
+        sent = self.clean_text(raw)
+        if (
+            len(sent) >= 40
+            and len(sent.split()) >= 7
+            and sent[0].isupper()
+            and sent[-1] in '.!?'
+        ):
+            return sent
+        return None
 
     def is_valid_subject(self, subject: str) -> bool:
         s = subject.lower().strip()
         if len(s) < 2 or len(s) > 60:
             return False
-        bad_starts = [
-            'the ', 'a ', 'an ', 'this ', 'that ',
-            'in ', 'on ', 'at ', 'by ', 'for ', 'of ', 'to ', 'from '
-        ]
-        if any(s.startswith(p) for p in bad_starts):
-            return False
-        bad_ends = [' and', ' or', ' but', ' of', ' in', ' on', ' at']
-        if any(s.endswith(p) for p in bad_ends):
+        if s.startswith(_BAD_SUBJECT_STARTS) or s.endswith(_BAD_SUBJECT_ENDS):
             return False
-        if not re.search(r'[a-zA-Z]', subject):
+        if not _HAS_LETTER_RE.search(subject):
             return False
         return True
 
     def clean_subject(self, subject: str) -> str:
-        subject = re.sub(r'^(?:the|a|an)\s+', '', subject, flags=re.IGNORECASE)
+        subject = _LEADING_ARTICLE_RE.sub('', subject)
         subject = subject.rstrip('.,;:')
         if subject:
             subject = subject[0].upper() + subject[1:]
@@ -184,37 +564,44 @@ class QuizGenerator:
     # CONCEPT EXTRACTION
     # ──────────────────────────────────────────────────────────────────────────
 
-    def extract_concepts(self, text: str) -> List[Dict]:
+    def extract_concepts(self, text: str, doc=None) -> List[Dict]:
         if self.use_ml and self.spacy_nlp:
-            return self._extract_concepts_spacy(text)
+            return self._extract_concepts_spacy(text, doc=doc)
         return self._extract_concepts_rule_based(text)
 
-    def _extract_concepts_spacy(self, text: str) -> List[Dict]:
+    def _extract_concepts_spacy(self, text: str, doc=None) -> List[Dict]:
         if not self.spacy_nlp:
             return self._extract_concepts_rule_based(text)
         try:
-            doc = self.spacy_nlp(text)
+            if doc is None:
+                doc = self.spacy_nlp(text)
             concepts: Dict[str, Dict] = {}
 
             for ent in doc.ents:
-                if ent.label_ in ['PERSON', 'ORG', 'GPE', 'EVENT', 'PRODUCT', 'LOC', 'FAC']:
+                if ent.label_ in _SPACY_ENTITY_LABELS:
                     clean = self.clean_subject(ent.text)
                     if self.is_valid_subject(clean):
                         entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 5})
                         entry['frequency'] += 2
 
             for chunk in doc.noun_chunks:
+                # Under two characters is_valid_subject always rejects (cleaning only
+                # shortens); checked on the span offsets before chunk.text is built
+                if chunk.end_char - chunk.start_char < 2:
+                    continue
                 clean = self.clean_subject(chunk.text)
                 if self.is_valid_subject(clean):
                     entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 2})
                     entry['frequency'] += 1
 
-            for token in doc:
-                if token.pos_ == 'NOUN' and len(token.text) > 3:
-                    clean = token.text.capitalize()
-                    if self.is_valid_subject(clean):
-                        entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 1})
-                        entry['frequency'] += 1
+            # Filter nouns on the attribute array instead of dispatching pos_/text per token;
+            # strings are only materialised for the tokens that survive the mask.
+            attrs = doc.to_array(list(self._noun_filter_attrs))
+            for i in np.flatnonzero((attrs[:, 0] == self._noun_pos) & (attrs[:, 1] > 3)):
+                clean = doc[int(i)].text.capitalize()
+                if self.is_valid_subject(clean):
+                    entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 1})
+                    entry['frequency'] += 1
 
             return sorted(concepts.values(), key=lambda x: x['frequency'] * x['importance'], reverse=True)[:20]
         except Exception:
@@ -223,31 +610,30 @@ class QuizGenerator:
     def _extract_concepts_rule_based(self, text: str) -> List[Dict]:
         concepts: Dict[str, Dict] = {}
 
-        for term in re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3}\b', text):
+        for term in _CAPITALISED_TERM_RE.findall(text):
             clean = self.clean_subject(term)
             if self.is_valid_subject(clean):
                 entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 3})
                 entry['frequency'] += 1
 
-        for term in re.findall(r'["\']([^"\']{3,40})["\']', text):
+        for term in _QUOTED_TERM_RE.findall(text):
             clean = self.clean_subject(term)
             if self.is_valid_subject(clean):
                 entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 5})
                 entry['frequency'] += 2
 
-        for subj in re.findall(r'\b([A-Z][a-zA-Z\s]{2,35}?)\s+(?:is|are)\s+(?:a|an|the)\s+', text):
+        for subj in _DEFINED_TERM_RE.findall(text):
             clean = self.clean_subject(subj)
             if self.is_valid_subject(clean):
                 entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 4})
                 entry['frequency'] += 3
 
-        noun_counts: Dict[str, int] = defaultdict(int)
-        for noun in re.findall(r'\b([a-z]{4,})\b', text):
-            if noun not in self.stopwords:
-                noun_counts[noun] += 1
+        # Counter tallies in C; stopwords are then skipped once per distinct word
+        # instead of once per occurrence.
+        noun_counts = Counter(_LOWER_WORD_RE.findall(text))
 
         for noun, count in noun_counts.items():
-            if count >= 2:
+            if count >= 2 and noun not in self.stopwords:
                 clean = noun.capitalize()
                 if self.is_valid_subject(clean):
                     entry = concepts.setdefault(clean, {'text': clean, 'frequency': 0, 'importance': 2})
@@ -259,21 +645,24 @@ class QuizGenerator:
     # FACT EXTRACTION
     # ──────────────────────────────────────────────────────────────────────────
 
-    def extract_facts(self, text: str) -> List[Dict]:
+    def extract_facts(self, text: str, sentences: Optional[Iterable[str]] = None) -> List[Dict]:
         """
         Extract (subject, predicate, sentence) triples from declarative sentences.
         Only keeps facts where:
         - subject is a valid noun phrase (not a pronoun or article-led fragment)
         - predicate is a meaningful clause (not a raw fragment)
+
+        Pass `sentences` when the caller has already split `text` to skip a second pass.
         """
         facts = []
-        sentences = self.split_sentences(text)
+        if sentences is None:
+            sentences = self.iter_sentences(text)
 
         for sentence in sentences:
             # Pattern 1: "X is/are Y"
-            m = re.search(
-                r'^([A-Z][a-zA-Z]+(?:\s+[A-Z]?[a-z]+){0,4})\s+(is|are)\s+(.+?)(?:\.\s*$|$)',
-                sentence
+            m = (
+                _DEFINITION_FACT_RE.search(sentence)
+                if any(v in sentence for v in _DEFINITION_VERBS) else None
             )
             if m:
                 subject = self.clean_subject(m.group(1).strip())
@@ -293,9 +682,9 @@ class QuizGenerator:
                     })
 
             # Pattern 2: "X has/includes/contains Y"
-            m2 = re.search(
-                r'([A-Z][a-zA-Z\s]{2,35}?)\s+(has|have|includes|contains|consists of)\s+(.+?)(?:\.|$)',
-                sentence
+            m2 = (
+                _PROPERTY_FACT_RE.search(sentence)
+                if any(v in sentence for v in _PROPERTY_VERBS) else None
             )
             if m2:
                 subject = self.clean_subject(m2.group(1).strip())
@@ -314,18 +703,40 @@ class QuizGenerator:
                         'score': len(predicate.split()) + 3
                     })
 
-        facts.sort(key=lambda x: x['score'], reverse=True)
-        return facts
+        # A quiz is 10 questions; beyond _MAX_FACTS the tail only ever feeds the
+        # distractor pool, which stops at 8. nlargest keeps sorted()'s tie order.
+        return heapq.nlargest(_MAX_FACTS, facts, key=lambda x: x['score'])
+
+    def _parse_lesson(self, content: str) -> tuple:
+        """
+        Sentences, fact table and embedding store for a lesson, memoised (LRU) by a
+        blake2b digest of the text. Sentences and facts are treated as read-only by
+        generate_questions, so hits are shared; the embedding dict only ever grows,
+        so every quiz on the same lesson reuses vectors encoded by earlier ones.
+        """
+        key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+        with self._lesson_cache_lock:
+            hit = self._lesson_cache.get(key)
+            if hit is not None:
+                self._lesson_cache.move_to_end(key)
+                return hit
+
+        sentences = self.split_sentences(content)
+        facts = _FactTable.from_facts(self.extract_facts(content, sentences=sentences))
+        parsed = (sentences, facts, {})
+
+        with self._lesson_cache_lock:
+            self._lesson_cache[key] = parsed
+            if len(self._lesson_cache) > _LESSON_CACHE_SIZE:
+                self._lesson_cache.popitem(last=False)
+        return parsed
 
     def _is_fragment(self, text: str) -> bool:
         """Return True if the text is a dangling fragment, not a meaningful clause."""
         t = text.strip().lower()
         # Starts with a conjunction or preposition fragment
-        bad = ['a byproduct', 'the byproduct', 'a result', 'the result',
-               'an example', 'the example', 'a type', 'the type']
-        for b in bad:
-            if t == b or t.startswith(b + ' of'):
-                return True
+        if t in _FRAGMENT_HEADS or t.startswith(_FRAGMENT_PREFIXES):
+            return True
         # Too short to carry meaning
         if len(t.split()) <= 2:
             return True
@@ -341,7 +752,7 @@ class QuizGenerator:
     def _make_distractor_pool(
         self,
         correct_answer: str,
-        all_facts: List[Dict],
+        all_facts: _FactTable,
         concept: str,
         used_answers: Set[str],
         target_load: str
@@ -359,27 +770,30 @@ class QuizGenerator:
         seen.update(a.lower() for a in used_answers)
 
         # ── Tier 1: predicates from other facts ──────────────────────────────
-        for fact in all_facts:
+        concept_lower = concept.lower()
+        for subject_lower, pred, pred_lower in zip(
+            all_facts.subjects_lower, all_facts.answers, all_facts.answers_lower
+        ):
             if len(pool) >= 8:
                 break
-            if fact.get('subject', '').lower() == concept.lower():
+            if subject_lower == concept_lower:
                 continue
-            pred = fact.get('predicate', '').strip().rstrip('.')
             if (
-                pred.lower() not in seen
+                pred_lower not in seen
                 and len(pred.split()) >= 5
                 and len(pred) >= 25
                 and not self._is_fragment(pred)
             ):
                 pool.append(pred)
-                seen.add(pred.lower())
+                seen.add(pred_lower)
 
         # ── Tier 2: structural paraphrases of the correct answer ─────────────
         paraphrases = self._generate_paraphrase_distractors(correct_answer, target_load)
         for p in paraphrases:
-            if p.lower() not in seen and len(p.split()) >= 4:
+            p_lower = p.lower()
+            if p_lower not in seen and len(p.split()) >= 4:
                 pool.append(p)
-                seen.add(p.lower())
+                seen.add(p_lower)
 
         return pool
 
@@ -392,56 +806,90 @@ class QuizGenerator:
         words = correct.split()
 
         # Swap key nouns/adjectives with domain-adjacent alternatives
-        swaps = {
-            'light': ['chemical', 'thermal', 'mechanical', 'electrical'],
-            'chemical': ['light', 'thermal', 'kinetic', 'electrical'],
-            'energy': ['matter', 'mass', 'heat', 'force'],
-            'carbon dioxide': ['oxygen', 'nitrogen', 'water vapour', 'hydrogen'],
-            'oxygen': ['carbon dioxide', 'nitrogen', 'glucose', 'water'],
-            'glucose': ['starch', 'cellulose', 'fructose', 'sucrose'],
-            'water': ['carbon dioxide', 'oxygen', 'glucose', 'minerals'],
-            'chlorophyll': ['carotenoids', 'anthocyanins', 'xanthophylls', 'cytochromes'],
-            'chloroplasts': ['mitochondria', 'ribosomes', 'vacuoles', 'nuclei'],
-            'plants': ['animals', 'fungi', 'bacteria', 'archaea'],
-            'sunlight': ['chemical energy', 'thermal energy', 'electrical energy'],
-            'synthesis': ['breakdown', 'hydrolysis', 'oxidation', 'reduction'],
-            'convert': ['store', 'release', 'absorb', 'reflect'],
-            'absorb': ['reflect', 'transmit', 'emit', 'store'],
-            'release': ['absorb', 'store', 'convert', 'produce'],
-        }
-
         correct_lower = correct.lower()
-        for key, alts in swaps.items():
+        for key, alts in _PARAPHRASE_SWAPS.items():
             if key in correct_lower:
                 for alt in alts[:2]:
-                    variant = re.sub(re.escape(key), alt, correct, flags=re.IGNORECASE, count=1)
-                    if variant.lower() != correct.lower():
+                    variant = _PARAPHRASE_SWAP_RES[key].sub(alt, correct, count=1)
+                    if variant.lower() != correct_lower:
                         distractors.append(variant)
                 break  # only one swap per distractor pass
 
         # Partial reversal: negate the main verb
-        negations = [
-            (r'\bconvert\b', 'store rather than convert'),
-            (r'\babsorb\b', 'reflect rather than absorb'),
-            (r'\brelease\b', 'consume rather than release'),
-            (r'\bproduce\b', 'consume rather than produce'),
-            (r'\bsynthesiz', 'break down rather than synthesize'),
-        ]
-        for pattern, replacement in negations:
-            if re.search(pattern, correct, re.IGNORECASE):
-                variant = re.sub(pattern, replacement, correct, flags=re.IGNORECASE, count=1)
-                if variant.lower() != correct.lower():
+        for pattern, replacement in _PARAPHRASE_NEGATIONS:
+            if pattern.search(correct):
+                variant = pattern.sub(replacement, correct, count=1)
+                if variant.lower() != correct_lower:
                     distractors.append(variant)
                 break
 
         return distractors
 
+    def _encode(self, model, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts in one call. SentenceTransformer.encode already length-sorts the
+        list into similarly padded mini-batches and restores input order, so callers
+        should hand it everything at once rather than pre-sorting or chunking.
+        """
+        return model.encode(
+            texts,
+            batch_size=32,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+    def _embed(self, model, texts: List[str], cache: Optional[_EmbeddingCache]) -> np.ndarray:
+        """Look texts up in the quiz cache, encoding only what it has not seen yet."""
+        if cache is None:
+            return self._encode(model, texts)
+        vectors = cache.vectors
+        missing = [t for t in texts if t not in vectors]
+        if missing:
+            if cache.seed is not None:
+                seed, cache.seed = cache.seed, None
+                missing = [t for t in seed() if t not in vectors] + missing
+            # Encode each distinct string once (predicates usually equal their stripped
+            # form). No pre-sort: encode() already length-sorts into tightly padded batches.
+            missing = list(dict.fromkeys(missing))
+            vectors.update(zip(missing, self._encode(model, missing)))
+        return np.stack([vectors[t] for t in texts])
+
+    def _ranking_texts(
+        self,
+        facts: _FactTable,
+        target_load: str,
+        start: int,
+        limit: int,
+        used_answers: Set[str]
+    ) -> List[str]:
+        """
+        Strings _rank_distractors is likely to be asked about for the next `limit` facts
+        from `start` whose predicate is not already a correct answer.
+        """
+        texts = []
+        taken = 0
+        for predicate, answer in zip(
+            itertools.islice(facts.predicates, start, None),
+            itertools.islice(facts.answers, start, None)
+        ):
+            if taken >= limit:
+                break
+            if predicate.lower() in used_answers:
+                continue
+            taken += 1
+            texts.append(predicate)
+            texts.append(answer)
+            texts.extend(self._generate_paraphrase_distractors(predicate, target_load))
+        return texts
+
     def _rank_distractors(
         self,
         correct: str,
         candidates: List[str],
         target_load: str,
-        num_needed: int
+        num_needed: int,
+        emb_cache: Optional[_EmbeddingCache] = None
     ) -> List[str]:
         """
         Rank distractors by semantic similarity to the correct answer.
@@ -449,24 +897,28 @@ class QuizGenerator:
         - OPTIMAL  → medium similarity
         - LOW      → high similarity (hard to distinguish)
         """
-        if not self.distilbert_model or len(candidates) < num_needed:
+        # Nothing to choose between: every candidate is used and _build_mcq shuffles
+        # the options anyway, so skip the encoder (and its first-use load) entirely.
+        if len(candidates) <= num_needed:
+            return candidates[:num_needed]
+        model = self._get_encoder()
+        if not model:
             return candidates[:num_needed]
 
         try:
             all_texts = [correct] + candidates
-            embeddings = self.distilbert_model.encode(all_texts)
-            correct_emb = embeddings[0]
-
-            ideal = {'OVERLOAD': 0.25, 'LOW': 0.70, 'OPTIMAL': 0.50}.get(target_load.upper(), 0.50)
-
-            scored = []
-            for i, emb in enumerate(embeddings[1:]):
-                norm = np.linalg.norm(correct_emb) * np.linalg.norm(emb)
-                sim = float(np.dot(correct_emb, emb) / norm) if norm > 0 else 0.0
-                scored.append((candidates[i], abs(sim - ideal)))
-
-            scored.sort(key=lambda x: x[1])
-            return [s[0] for s in scored[:num_needed]]
+            embeddings = self._embed(model, all_texts, emb_cache)
+            ideal = _IDEAL_SIMILARITY.get(target_load.upper(), 0.50)
+
+            # Rows are unit-norm (see _encode), so cosine similarity is one GEMV
+            sims = embeddings[1:] @ embeddings[0]
+
+            # Only the num_needed closest-to-ideal candidates matter: partition in O(n),
+            # then order just that slice.
+            deviation = np.abs(sims - ideal)
+            nearest = np.argpartition(deviation, num_needed - 1)[:num_needed]
+            nearest = nearest[np.lexsort((nearest, deviation[nearest]))]
+            return [candidates[i] for i in nearest]
         except Exception:
             return candidates[:num_needed]
 
@@ -479,37 +931,48 @@ class QuizGenerator:
         question_text: str,
         correct: str,
         distractors: List[str],
-        num_options: int
+        num_options: int,
+        rng: Optional[random.Random] = None
     ) -> Optional[Dict]:
         question_text = self.clean_text(question_text)
         correct = self.clean_text(correct)
         if not question_text.endswith('?'):
             question_text += '?'
 
+        needed = num_options - 1
+        correct_lower = correct.lower()
         unique_distractors = []
+        seen_distractors: Set[str] = set()
         for d in distractors:
+            if len(unique_distractors) >= needed:
+                break
             d = self.clean_text(d)
             if (
-                d.lower() != correct.lower()
-                and d not in unique_distractors
+                d.lower() != correct_lower
+                and d not in seen_distractors
                 and len(d.split()) >= 3
                 and len(d) >= 15
             ):
                 unique_distractors.append(d)
+                seen_distractors.add(d)
 
-        needed = num_options - 1
         if len(unique_distractors) < needed:
             return None
 
-        options = [correct] + unique_distractors[:needed]
-        random.shuffle(options)
+        # Shuffle the distractors and drop the answer into a random slot, so its
+        # index is known without scanning the options for it afterwards.
+        rng = rng or random
+        options = unique_distractors[:needed]
+        rng.shuffle(options)
+        correct_index = rng.randrange(len(options) + 1)
+        options.insert(correct_index, correct)
 
         q = {
-            'id': str(uuid.uuid4()),
+            'id': _next_question_id(),
             'type': 'multiple',
             'question': question_text,
             'options': options,
-            'correct_index': options.index(correct)
+            'correct_index': correct_index
         }
         return q if self._validate_question(q) else None
 
@@ -522,7 +985,7 @@ class QuizGenerator:
             return None
 
         return {
-            'id': str(uuid.uuid4()),
+            'id': _next_question_id(),
             'type': 'truefalse',
             'question': f'True or False: {statement}?',
             'options': ['True', 'False'],
@@ -537,7 +1000,7 @@ class QuizGenerator:
             return False
         if not question.endswith('?') or not question[0].isupper():
             return False
-        if re.search(r'\b(?:and|or|but|of|in|on|at)\s*\?$', question):
+        if _DANGLING_END_RE.search(question):
             return False
         if len(options) not in (2, 3, 4):
             return False
@@ -553,55 +1016,7 @@ class QuizGenerator:
     # ──────────────────────────────────────────────────────────────────────────
 
     def _get_templates(self, target_load: str) -> Dict[str, List[str]]:
-        load = target_load.upper()
-        if load == 'OVERLOAD':
-            return {
-                'definition': [
-                    'What is {concept}?',
-                    'What does {concept} mean?',
-                ],
-                'property': [
-                    'What is true about {concept}?',
-                    'Which fact about {concept} is correct?',
-                ],
-                'general': [
-                    'According to the lesson, what is {concept}?',
-                ]
-            }
-        if load == 'LOW':
-            return {
-                'definition': [
-                    'Which of the following best explains {concept}?',
-                    'What is the most accurate definition of {concept}?',
-                    'How would you describe {concept} based on the lesson?',
-                ],
-                'property': [
-                    'Which statement best describes a key characteristic of {concept}?',
-                    'What can be concluded about {concept} from the lesson?',
-                    'Which explanation of {concept} is most accurate?',
-                ],
-                'general': [
-                    'What conclusion can be drawn about {concept}?',
-                    'Which statement best summarises the role of {concept}?',
-                ]
-            }
-        # OPTIMAL
-        return {
-            'definition': [
-                'What is {concept}?',
-                'Which of the following best describes {concept}?',
-                'According to the lesson, what is {concept}?',
-            ],
-            'property': [
-                'Which statement about {concept} is correct?',
-                'What is true about {concept} according to the lesson?',
-                'Which best describes a characteristic of {concept}?',
-            ],
-            'general': [
-                'What does the lesson say about {concept}?',
-                'According to the text, what is a key fact about {concept}?',
-            ]
-        }
+        return _TEMPLATES.get(target_load.upper(), _TEMPLATES['OPTIMAL'])
 
     # ──────────────────────────────────────────────────────────────────────────
     # MAIN GENERATION
@@ -611,7 +1026,9 @@ class QuizGenerator:
         self,
         content: str,
         num_questions: int = 10,
-        target_load: str = 'OPTIMAL'
+        target_load: str = 'OPTIMAL',
+        doc=None,
+        seed: Optional[int] = None
     ) -> List[Dict]:
         """
         Generate questions respecting cognitive load shape:
@@ -624,10 +1041,14 @@ class QuizGenerator:
         - No correct answer from one question appears as a distractor in another
         - T/F stems never start with dangling pronouns (This, It, They…)
         - Distractors are semantically plausible, not generic placeholders
+
+        Option and question order come from a per-quiz random.Random, so concurrent
+        requests don't contend on the global generator and `seed` makes a quiz reproducible.
         """
+        rng = random.Random(seed)
         num_questions = 10
         target_load = (target_load or 'OPTIMAL').strip().upper()
-        if target_load not in {'OVERLOAD', 'OPTIMAL', 'LOW'}:
+        if target_load not in _LOADS:
             target_load = 'OPTIMAL'
 
         if target_load == 'OVERLOAD':
@@ -638,16 +1059,16 @@ class QuizGenerator:
             target_mc, target_tf, num_options = 5, 5, 4
 
         templates = self._get_templates(target_load)
-        concepts = self.extract_concepts(content)
-        facts = self.extract_facts(content)
-        sentences = self.split_sentences(content)
+        concepts = self.extract_concepts(content, doc=doc)
+        sentences, facts, lesson_vectors = self._parse_lesson(content)
+        emb_cache = _EmbeddingCache(vectors=lesson_vectors)
 
         logger.info(
             f'Load={target_load} | facts={len(facts)} concepts={len(concepts)} '
             f'| target_mc={target_mc} target_tf={target_tf}'
         )
 
-        if not facts and not sentences:
+        if not len(facts) and not sentences:
             logger.warning('No usable content extracted')
             return []
 
@@ -657,19 +1078,28 @@ class QuizGenerator:
         mc_count = 0
         tf_count = 0
 
+        # Templates per fact type code, resolved once instead of per fact
+        type_templates = [templates.get(name, templates['definition']) for name in _FACT_TYPE_NAMES]
+
+        # Warm-up texts for the encoder, built on the first ranking that really encodes:
+        # reads the current fact index `i` and MCQ count at that moment, so only facts
+        # that can still become MCQs are seeded.
+        emb_cache.seed = lambda: self._ranking_texts(
+            facts, target_load, i, target_mc - mc_count, used_correct_answers
+        )
+
         # ── Phase 1: facts → MCQ + T/F ────────────────────────────────────────
-        for fact in facts:
+        for i, fact_type in enumerate(facts.types):
             if mc_count >= target_mc and tf_count >= target_tf:
                 break
 
-            subject = fact['subject']
-            predicate = fact['predicate']
-            sentence = fact['sentence']
+            subject = facts.subjects[i]
+            predicate = facts.predicates[i]
+            sentence = facts.sentences[i]
 
             # MCQ
             if mc_count < target_mc:
-                fact_templates = templates.get(fact['type'], templates['definition'])
-                for tmpl in fact_templates:
+                for tmpl in type_templates[fact_type]:
                     q_text = tmpl.format(concept=subject)
                     if q_text.lower() in used_question_texts:
                         continue
@@ -678,14 +1108,11 @@ class QuizGenerator:
                         predicate, facts, subject, used_correct_answers, target_load
                     )
 
-                    if self.distilbert_model:
-                        distractors = self._rank_distractors(
-                            predicate, distractor_pool, target_load, num_options - 1
-                        )
-                    else:
-                        distractors = distractor_pool[:num_options - 1]
+                    distractors = self._rank_distractors(
+                        predicate, distractor_pool, target_load, num_options - 1, emb_cache
+                    )
 
-                    q = self._build_mcq(q_text, predicate, distractors, num_options)
+                    q = self._build_mcq(q_text, predicate, distractors, num_options, rng)
                     if q:
                         questions.append(q)
                         used_question_texts.add(q_text.lower())
@@ -721,26 +1148,22 @@ class QuizGenerator:
 
         # ── Phase 3: fill remaining MCQ from concepts ─────────────────────────
         if mc_count < target_mc:
-            for fact in facts:
+            for i, fact_type in enumerate(facts.types):
                 if mc_count >= target_mc:
                     break
-                subject = fact['subject']
-                predicate = fact['predicate']
-                fact_templates = templates.get(fact['type'], templates['definition'])
-                for tmpl in fact_templates:
+                subject = facts.subjects[i]
+                predicate = facts.predicates[i]
+                for tmpl in type_templates[fact_type]:
                     q_text = tmpl.format(concept=subject)
                     if q_text.lower() in used_question_texts:
                         continue
                     distractor_pool = self._make_distractor_pool(
                         predicate, facts, subject, used_correct_answers, target_load
                     )
-                    if self.distilbert_model:
-                        distractors = self._rank_distractors(
-                            predicate, distractor_pool, target_load, num_options - 1
-                        )
-                    else:
-                        distractors = distractor_pool[:num_options - 1]
-                    q = self._build_mcq(q_text, predicate, distractors, num_options)
+                    distractors = self._rank_distractors(
+                        predicate, distractor_pool, target_load, num_options - 1, emb_cache
+                    )
+                    q = self._build_mcq(q_text, predicate, distractors, num_options, rng)
                     if q:
                         questions.append(q)
                         used_question_texts.add(q_text.lower())
@@ -751,11 +1174,14 @@ class QuizGenerator:
         # ── Phase 4: fallback T/F from concept sentences ──────────────────────
         if len(questions) < num_questions:
             primary_subject = concepts[0]['text'] if concepts else ''
+            # Lowercase each sentence once rather than once per (concept, sentence) pair
+            sentences_lower = [s.lower() for s in sentences]
             for concept in concepts[:15]:
                 if len(questions) >= num_questions:
                     break
-                for sentence in sentences:
-                    if concept['text'].lower() in sentence.lower():
+                concept_lower = concept['text'].lower()
+                for sentence, sentence_lower in zip(sentences, sentences_lower):
+                    if concept_lower in sentence_lower:
                         stem = self._rewrite_tf_stem(sentence, subject_hint=primary_subject)
                         if stem and stem.lower() not in used_question_texts:
                             q = self._build_tf(stem)
@@ -765,13 +1191,32 @@ class QuizGenerator:
                                 break
 
         questions = questions[:num_questions]
-        random.shuffle(questions)
+        rng.shuffle(questions)
         logger.info(
             f'Final: {len(questions)} questions '
             f'(MCQ={mc_count}, TF={tf_count}) for load={target_load}'
         )
         return questions
 
+    def generate_questions_batch(
+        self,
+        lessons: List[str],
+        num_questions: int = 10,
+        target_load: str = 'OPTIMAL'
+    ) -> List[List[Dict]]:
+        """
+        Generate quizzes for several lessons at once.
+        spaCy parses all lessons in a single nlp.pipe() stream instead of one call per lesson.
+        """
+        if self.use_ml and self.spacy_nlp:
+            docs = self.spacy_nlp.pipe(lessons, batch_size=16)
+        else:
+            docs = (None for _ in lessons)
+        return [
+            self.generate_questions(content, num_questions=num_questions, target_load=target_load, doc=doc)
+            for content, doc in zip(lessons, docs)
+        ]
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Public entry point
@@ -781,7 +1226,10 @@ def generate_quiz_from_content(
     content: str,
     num_questions: int = 10,
     target_load: str = 'OPTIMAL',
-    use_ml: bool = True
+    use_ml: bool = True,
+    use_spacy: bool = True,
+    encoder_backend: str = 'torch',
+    seed: Optional[int] = None
 ) -> List[Dict]:
     """
     Generate quiz questions from lesson content.
@@ -791,13 +1239,50 @@ def generate_quiz_from_content(
         num_questions: Always generates 10 (arg kept for API compatibility).
         target_load:   'OVERLOAD' | 'OPTIMAL' | 'LOW'
         use_ml:        Whether to attempt loading spaCy / SentenceTransformer.
+        use_spacy:     With use_ml, whether to load spaCy for concept extraction
+                       (False keeps ML distractor ranking but skips spaCy's RAM).
+        encoder_backend: 'torch' (default) or 'onnx' for the int8 ONNX Runtime encoder;
+                       falls back to torch if the ONNX backend cannot be loaded.
+        seed:          Optional seed for option/question order (reproducible quizzes in tests).
 
     Returns:
         List of question dicts with keys: id, type, question, options, correct_index
     """
-    generator = _get_quiz_generator(use_ml)
+    generator = _get_quiz_generator(use_ml, use_spacy, encoder_backend)
     return generator.generate_questions(
         content=content,
         num_questions=num_questions,
+        target_load=target_load,
+        seed=seed
+    )
+
+
+def generate_quizzes_from_contents(
+    contents: List[str],
+    num_questions: int = 10,
+    target_load: str = 'OPTIMAL',
+    use_ml: bool = True,
+    use_spacy: bool = True,
+    encoder_backend: str = 'torch'
+) -> List[List[Dict]]:
+    """
+    Generate quiz questions for several lessons at one cognitive load.
+    Same arguments as generate_quiz_from_content; spaCy parses the lessons as one batch.
+
+    Returns:
+        One list of question dicts per lesson, in input order
+    """
+    generator = _get_quiz_generator(use_ml, use_spacy, encoder_backend)
+    return generator.generate_questions_batch(
+        contents,
+        num_questions=num_questions,
         target_load=target_load
-    )
\ No newline at end of file
+    )
+
+
+def reissue_question_ids(questions: List[Dict]) -> List[Dict]:
+    """
+    Copies of questions with newly issued ids, for reusing generated questions
+    (e.g. from a cache) in another quiz without sharing question ids.
+    """
+    return [{**q, 'id': _next_question_id()} for q in questions]
@@ -2,8 +2,37 @@
 ML Utilities
 Helper functions for ML operations
 """
-# TODO: Add utility functions
-# - Model loading
-# - Data preprocessing
-# - Post-processing
+import logging
+from functools import lru_cache
 
+logger = logging.getLogger(__name__)
+
+_SPACY_MODEL = "en_core_web_sm"
+
+# Components any caller reads: noun_chunks and dependencies (parser), ents (ner) and
+# pos_ (tagger + attribute_ruler). The lemmatizer and anything else in the packaged
+# pipeline is dead weight per call.
+_SPACY_PIPES = ('tok2vec', 'tagger', 'attribute_ruler', 'parser', 'ner')
+
+
+@lru_cache(maxsize=1)
+def get_spacy_nlp():
+    """
+    Process-wide spaCy English pipeline, loaded on first use and shared by the quiz
+    generator and the adaptive text engine. Returns None if spaCy or the model is
+    not installed, so callers can fall back to their rule-based paths.
+    """
+    try:
+        import spacy
+    except ImportError:
+        return None
+    try:
+        # exclude= skips deserialising the lemmatizer at all; select_pipes then
+        # disables anything else no caller reads.
+        nlp = spacy.load(_SPACY_MODEL, exclude=["lemmatizer"])
+    except Exception as e:
+        logger.warning(f"spaCy model '{_SPACY_MODEL}' unavailable: {e}")
+        return None
+    nlp.select_pipes(enable=[p for p in _SPACY_PIPES if p in nlp.pipe_names])
+    logger.info("✅ spaCy loaded")
+    return nlp
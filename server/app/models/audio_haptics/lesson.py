@@ -8,10 +8,10 @@ should be synchronized with visual/audio for key concepts (Hebbian learning).
 from datetime import datetime
 from typing import List, Optional
 from beanie import Document, PydanticObjectId
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 
-class Concept(Document):
+class Concept(BaseModel):
     """Concept embedded in a lesson.
 
     audio_script drives narration; haptics_pattern supports embodied encoding
@@ -5,10 +5,11 @@ Tracks student interactions during quiz taking for cognitive load analysis
 from datetime import datetime
 from typing import List, Optional, Dict
 from beanie import Document, PydanticObjectId
-from pydantic import Field
+from pydantic import BaseModel, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
-class QuestionInteraction(Document):
+class QuestionInteraction(BaseModel):
     """Individual question interaction data"""
     
     question_id: str
@@ -64,5 +65,10 @@ class BehaviorLog(Document):
     
     class Settings:
         name = "behavior_logs"
-        indexes = ["quiz_id", "user_id", "lesson_id", "session_started"]
+        indexes = [
+            # Per-learner history for a lesson, newest session first
+            IndexModel([("user_id", ASCENDING), ("lesson_id", ASCENDING), ("session_started", DESCENDING)]),
+            # get_behavior_log: find_one(quiz_id, user_id). Not unique - a quiz can be retaken
+            IndexModel([("quiz_id", ASCENDING), ("user_id", ASCENDING)]),
+        ]
 
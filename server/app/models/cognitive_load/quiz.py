@@ -4,10 +4,11 @@ Quiz Models
 from datetime import datetime
 from typing import List, Optional
 from beanie import Document, PydanticObjectId
-from pydantic import Field
+from pydantic import BaseModel, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
-class QuizQuestion(Document):
+class QuizQuestion(BaseModel):
     """Quiz question embedded in quiz"""
 
     id: str
@@ -45,5 +46,11 @@ class QuizResult(Document):
 
     class Settings:
         name = "quiz_results"
-        indexes = ["quiz_id", "user_id", "completed_at"]
+        indexes = [
+            # Results list / progress: find(user_id).sort(-completed_at)
+            IndexModel([("user_id", ASCENDING), ("completed_at", DESCENDING)]),
+            # get_quiz_result / behavior logging: find_one(quiz_id, user_id). Not unique -
+            # retakes add a result per attempt
+            IndexModel([("quiz_id", ASCENDING), ("user_id", ASCENDING)]),
+        ]
 
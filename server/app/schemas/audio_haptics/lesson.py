@@ -3,7 +3,7 @@ Lesson Schemas
 """
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ConceptSchema(BaseModel):
@@ -40,6 +40,5 @@ class LessonResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
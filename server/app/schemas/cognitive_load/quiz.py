@@ -3,7 +3,7 @@ Quiz Schemas
 """
 from datetime import datetime
 from typing import List, Optional, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class QuestionSchema(BaseModel):
@@ -22,6 +22,12 @@ class QuizGenerateRequest(BaseModel):
     lesson_id: str
 
 
+class QuizBulkGenerateRequest(BaseModel):
+    """Bulk quiz generation request schema - one quiz per lesson"""
+
+    lesson_ids: List[str] = Field(..., min_length=1, max_length=20)
+
+
 class AnswerSchema(BaseModel):
     """Answer schema for quiz submission"""
     
@@ -98,8 +104,7 @@ class QuizResponse(BaseModel):
     questions: List[dict] = []
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class QuizResultResponse(BaseModel):
@@ -115,6 +120,5 @@ class QuizResultResponse(BaseModel):
     cognitive_load: Optional[str] = None  # "Low", "Medium", "High"
     cognitive_load_confidence: Optional[float] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
@@ -1,11 +1,15 @@
 """
 User Schemas
 """
+import re
 from datetime import datetime, date, time
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from enum import Enum
 
+# Letters/digits (Unicode, as str.isalnum), underscores and hyphens, with at least one letter or digit
+_USERNAME_RE = re.compile(r"[\w-]*[^\W_][\w-]*")
+
 
 class GenderEnum(str, Enum):
     """Gender options"""
@@ -33,6 +37,9 @@ class DifficultyLevelEnum(str, Enum):
 class UserSignup(BaseModel):
     """User signup schema - minimal fields required for registration"""
     
+    # Store enum fields as their string values (gender is a plain str after validation)
+    model_config = ConfigDict(use_enum_values=True)
+    
     email: EmailStr
     username: str = Field(..., min_length=3, max_length=50, description="Username must be between 3-50 characters")
     password: str = Field(..., min_length=8, description="Password must be at least 8 characters")
@@ -62,7 +69,7 @@ class UserSignup(BaseModel):
     @classmethod
     def validate_username(cls, v: str) -> str:
         """Validate username format"""
-        if not v.replace("_", "").replace("-", "").isalnum():
+        if not _USERNAME_RE.fullmatch(v):
             raise ValueError("Username can only contain letters, numbers, hyphens, and underscores")
         return v
 
@@ -70,6 +77,9 @@ class UserSignup(BaseModel):
 class UserCreate(BaseModel):
     """User creation schema - full user creation (for admin/internal use)"""
 
+    # Store enum fields as their string values
+    model_config = ConfigDict(use_enum_values=True)
+
     email: EmailStr
     username: str
     password: str = Field(..., min_length=8, description="Password must be at least 8 characters")
@@ -2,9 +2,24 @@
 Authentication Service
 """
 from datetime import datetime
+from enum import Enum
 from app.models.user import User
-from app.schemas.user import UserSignup, UserUpdate
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.schemas.user import UserSignup, UserUpdate, UserResponse
+from app.utils.security import get_password_hash, verify_and_update_password, create_access_token
+
+
+# Response fields copied as-is from the stored document (id is stringified separately)
+_USER_RESPONSE_FIELDS = tuple(name for name in UserResponse.model_fields if name != "id")
+
+
+def user_to_response(user: User) -> UserResponse:
+    """Convert User document to UserResponse schema"""
+    # The document was validated on load, so build the response without a
+    # model_dump_json() + json.loads() + model_validate() round-trip
+    return UserResponse.model_construct(
+        id=str(user.id),
+        **{name: getattr(user, name) for name in _USER_RESPONSE_FIELDS},
+    )
 
 async def register_user(user_data: UserSignup) -> User:
     """
@@ -19,14 +34,15 @@ async def register_user(user_data: UserSignup) -> User:
     Raises:
         ValueError: If email or username already exists
     """
-    # Check if email already exists
-    existing_user = await User.find_one({"email": user_data.email})
-    if existing_user:
-        raise ValueError("Email already registered")
-    
-    # Check if username already exists
-    existing_user = await User.find_one({"username": user_data.username})
-    if existing_user:
+    # Check email and username in one round-trip. Up to two users can clash (one on
+    # email, another on username), so fetch both and report the email conflict first,
+    # whichever document Mongo returns first.
+    existing_users = await User.find(
+        {"$or": [{"email": user_data.email}, {"username": user_data.username}]}
+    ).limit(2).to_list()
+    if existing_users:
+        if any(existing.email == user_data.email for existing in existing_users):
+            raise ValueError("Email already registered")
         raise ValueError("Username already taken")
     
     # Create new user with hashed password
@@ -38,7 +54,7 @@ async def register_user(user_data: UserSignup) -> User:
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         date_of_birth=user_data.date_of_birth,  # Already a datetime object
-        gender=user_data.gender.value if user_data.gender else None,
+        gender=user_data.gender,
         # Set default values for fields not in signup
         language="en",
         email_verified=False,
@@ -75,9 +91,12 @@ async def login_user(email: str, password: str) -> User:
     if not user.is_active:
         raise ValueError("User account is inactive")
     
-    # Verify password
-    if not verify_password(password, user.hashed_password):
+    # Verify password (legacy bcrypt hashes come back with an Argon2id replacement)
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
         raise ValueError("Invalid email or password")
+    if new_hash:
+        user.hashed_password = new_hash
     
     # Update last_login timestamp
     user.last_login = datetime.utcnow()
@@ -97,32 +116,25 @@ async def update_user(user: User, update_data: UserUpdate) -> User:
     Returns:
         Updated user object
     """
-    from enum import Enum
-    
-    # Convert update_data to dict, excluding unset values but including None
-    update_dict = update_data.model_dump(exclude_unset=True, exclude_none=False)
-    
-    # Handle enum fields - convert to string values
-    if "gender" in update_dict and update_dict["gender"] is not None:
-        if isinstance(update_dict["gender"], Enum):
-            update_dict["gender"] = update_dict["gender"].value
-    
-    if "learning_style" in update_dict and update_dict["learning_style"] is not None:
-        if isinstance(update_dict["learning_style"], Enum):
-            update_dict["learning_style"] = update_dict["learning_style"].value
-    
-    if "difficulty_level" in update_dict and update_dict["difficulty_level"] is not None:
-        if isinstance(update_dict["difficulty_level"], Enum):
-            update_dict["difficulty_level"] = update_dict["difficulty_level"].value
-    
-    # Update only provided fields
-    for field, value in update_dict.items():
-        setattr(user, field, value)  # Set the value (can be None to clear fields)
-    
-    # Update updated_at timestamp
-    user.updated_at = datetime.utcnow()
-    
-    # Save changes
-    await user.save()
+    # Convert update_data to dict, excluding unset values but including None.
+    # Enum fields (gender, learning_style, difficulty_level) are stored as their string
+    # values; mode="json" would also stringify consent_date, so unwrap them here instead.
+    provided = {
+        field: value.value if isinstance(value, Enum) else value
+        for field, value in update_data.model_dump(exclude_unset=True, exclude_none=False).items()
+    }
+    # Keep only the fields whose value actually differs from what is stored
+    update_dict = {
+        field: value for field, value in provided.items()
+        if getattr(user, field, None) != value
+    }
+    
+    # Nothing to change - skip the write entirely
+    if not update_dict:
+        return user
+    
+    # $set only the changed fields (None clears a field) instead of rewriting the
+    # whole document; Mongo stamps updated_at itself
+    await user.update({"$set": update_dict, "$currentDate": {"updated_at": True}})
     
     return user
@@ -6,6 +6,7 @@ Logs quiz session behavior and predicts cognitive load from behavioral proxies
 and, per Yerkes–Dodson, future modulation of stimulation intensity (e.g. reduce
 when high load, increase when low engagement).
 """
+import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 from beanie import PydanticObjectId
@@ -14,12 +15,36 @@ from app.models.cognitive_load.quiz import Quiz, QuizResult
 from app.ml.processors.feature_extractor import extract_features_from_behavior_log
 from app.ml.processors.cognitive_load_predictor import predict_cognitive_load
 
+logger = logging.getLogger(__name__)
+
+
+def _parse_iso_datetime(value: str) -> Optional[datetime]:
+    """Parse a client ISO-8601 timestamp, or None if malformed (3.11+ fromisoformat accepts a trailing Z)"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _feature_input(behavior_log: BehaviorLog) -> Dict:
+    """The fields extract_features_from_behavior_log reads, without a full model_dump()"""
+    return {
+        'total_time_seconds': behavior_log.total_time_seconds,
+        'total_questions': behavior_log.total_questions,
+        'question_interactions': behavior_log.question_interactions,
+        'answer_changes': behavior_log.answer_changes,
+        'correct_answers': behavior_log.correct_answers,
+        'incorrect_answers': behavior_log.incorrect_answers,
+    }
+
 
 async def create_behavior_log(
     quiz_id: PydanticObjectId,
     user_id: PydanticObjectId,
     lesson_id: PydanticObjectId,
-    session_data: Dict
+    session_data: Dict,
+    quiz: Optional[Quiz] = None,
+    quiz_result: Optional[QuizResult] = None
 ) -> BehaviorLog:
     """
     Create a behavior log from session data
@@ -29,64 +54,71 @@ async def create_behavior_log(
         user_id: ID of the user
         lesson_id: ID of the lesson
         session_data: Dictionary containing session interaction data
+        quiz: The quiz document, if the caller already has it (skips a fetch)
+        quiz_result: The result just scored for this session, if any (skips the
+            lookup and the later update_behavior_log_with_results pass)
         
     Returns:
         BehaviorLog document
     """
     # Get quiz to calculate metrics
-    quiz = await Quiz.get(quiz_id)
+    if quiz is None:
+        quiz = await Quiz.get(quiz_id)
     total_questions = len(quiz.questions) if quiz else session_data.get('total_questions', 0)
     
     # Extract timing data
     session_started = session_data.get('session_started')
     if isinstance(session_started, str):
-        try:
-            # Handle ISO format with Z
-            if session_started.endswith('Z'):
-                session_started = session_started[:-1] + '+00:00'
-            session_started = datetime.fromisoformat(session_started.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            session_started = datetime.utcnow()
-    elif session_started is None:
+        session_started = _parse_iso_datetime(session_started)
+    if session_started is None:
         session_started = datetime.utcnow()
     
     session_completed = session_data.get('session_completed')
     if session_completed and isinstance(session_completed, str):
-        try:
-            if session_completed.endswith('Z'):
-                session_completed = session_completed[:-1] + '+00:00'
-            session_completed = datetime.fromisoformat(session_completed.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            session_completed = None
+        session_completed = _parse_iso_datetime(session_completed)
     
     total_time = session_data.get('total_time_seconds', 0)
     
     # Extract question interactions
     question_interactions = session_data.get('question_interactions', [])
     
-    # Calculate metrics
-    questions_answered = len([q for q in question_interactions if q.get('answer_index') is not None])
+    # Calculate answer and time metrics in one pass over the interactions
+    # (questions without a recorded time are left out of the time stats)
+    questions_answered = 0
+    timed = 0
+    total_spent = 0
+    longest_time = 0
+    shortest_time = 0
+    for q in question_interactions:
+        if q.get('answer_index') is not None:
+            questions_answered += 1
+        spent = q.get('time_spent_seconds')
+        if spent:
+            if timed == 0 or spent > longest_time:
+                longest_time = spent
+            if timed == 0 or spent < shortest_time:
+                shortest_time = spent
+            total_spent += spent
+            timed += 1
     questions_skipped = total_questions - questions_answered
-    
-    # Calculate time metrics
-    times = [q.get('time_spent_seconds', 0) for q in question_interactions if q.get('time_spent_seconds')]
-    avg_time = sum(times) / len(times) if times else 0
-    longest_time = max(times) if times else 0
-    shortest_time = min(times) if times else 0
+    avg_time = total_spent / timed if timed else 0
     
     # Calculate answer correctness (if quiz result exists)
     correct_answers = 0
     incorrect_answers = 0
     
     # Get quiz result if it exists
-    quiz_result = await QuizResult.find_one(
-        QuizResult.quiz_id == quiz_id,
-        QuizResult.user_id == user_id
-    )
+    if quiz_result is None:
+        quiz_result = await QuizResult.find_one(
+            QuizResult.quiz_id == quiz_id,
+            QuizResult.user_id == user_id
+        )
     
     if quiz_result:
         correct_answers = quiz_result.correct_count
         incorrect_answers = quiz_result.total_questions - quiz_result.correct_count
+        if not session_completed:
+            session_completed = quiz_result.completed_at
     
     accuracy_rate = (
         correct_answers / (correct_answers + incorrect_answers)
@@ -118,14 +150,14 @@ async def create_behavior_log(
     
     # Extract features and predict cognitive load
     try:
-        behavior_dict = behavior_log.model_dump()
+        behavior_dict = _feature_input(behavior_log)
         features = extract_features_from_behavior_log(behavior_dict)
         predicted_load, confidence, _ = predict_cognitive_load(features)
         
         behavior_log.predicted_cognitive_load = predicted_load
         behavior_log.cognitive_load_confidence = confidence
     except Exception as e:
-        print(f"⚠️  Error predicting cognitive load: {str(e)}")
+        logger.warning("Error predicting cognitive load: %s", e)
         # Continue without prediction if model not available
     
     # Save to database
@@ -193,17 +225,27 @@ async def update_behavior_log_with_results(
         
         # Recalculate cognitive load with updated data
         try:
-            behavior_dict = behavior_log.model_dump()
+            behavior_dict = _feature_input(behavior_log)
             features = extract_features_from_behavior_log(behavior_dict)
             predicted_load, confidence, _ = predict_cognitive_load(features)
             
             behavior_log.predicted_cognitive_load = predicted_load
             behavior_log.cognitive_load_confidence = confidence
         except Exception as e:
-            print(f"⚠️  Error predicting cognitive load: {str(e)}")
+            logger.warning("Error predicting cognitive load: %s", e)
         
-        behavior_log.updated_at = datetime.utcnow()
-        await behavior_log.save()
+        # $set the recalculated fields and let Mongo stamp updated_at
+        await behavior_log.update({
+            "$set": {
+                "correct_answers": behavior_log.correct_answers,
+                "incorrect_answers": behavior_log.incorrect_answers,
+                "accuracy_rate": behavior_log.accuracy_rate,
+                "session_completed": behavior_log.session_completed,
+                "predicted_cognitive_load": behavior_log.predicted_cognitive_load,
+                "cognitive_load_confidence": behavior_log.cognitive_load_confidence,
+            },
+            "$currentDate": {"updated_at": True}
+        })
     
     return behavior_log
 
@@ -2,20 +2,259 @@
 Quiz Generation Service
 Service layer for quiz generation and management
 """
-from typing import List, Dict, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
 from beanie import PydanticObjectId
+from beanie.operators import In
 from app.models.audio_haptics.lesson import Lesson
+from app.models.cognitive_load.behavior import BehaviorLog
 from app.models.cognitive_load.quiz import Quiz, QuizResult
 from app.models.user import User
 from app.config import settings
-from app.ml.processors.quiz_generator import generate_quiz_from_content
+from app.ml.processors.quiz_generator import (
+    generate_quiz_from_content,
+    generate_quizzes_from_contents,
+    reissue_question_ids,
+)
 from app.ml.processors.cognitive_load_predictor import predict_cognitive_load
-from app.services.cognitive_load.behavior_service import (
-    create_behavior_log,
-    update_behavior_log_with_results
+from app.services.cognitive_load.behavior_service import create_behavior_log
+
+logger = logging.getLogger(__name__)
+
+# Defaults for behavioral features the client didn't send
+_DEFAULT_FEATURES: Dict[str, float] = {
+    'answerChanges': 0.0,
+    'currentErrorStreak': 0.0,
+    'idleGapsOverThreshold': 0.0,
+    'responseTimeVariability': 0.0,
+    'completionTime': 0.0,
+    'avgResponseTime': 0.0
+}
+
+# BehaviorDataSchema fields that carry session signal. A payload with all of them
+# unset/zero/empty would only duplicate what the QuizResult already stores.
+_BEHAVIOR_SIGNAL_FIELDS = (
+    'session_started',
+    'session_completed',
+    'total_time_seconds',
+    'question_interactions',
+    'back_navigations',
+    'forward_navigations',
+    'answer_changes',
 )
 
 
+def _answer_pair(ans) -> tuple:
+    """(question_id, answer_index) from a submitted answer, dict or Pydantic model"""
+    if isinstance(ans, dict):
+        return ans.get('question_id'), ans.get('answer_index')
+    return ans.question_id, ans.answer_index
+
+
+def _has_behavior_signal(behavior_data) -> bool:
+    """True if behavior data (dict or Pydantic model) has any session signal worth logging"""
+    if isinstance(behavior_data, dict):
+        return any(behavior_data.get(name) for name in _BEHAVIOR_SIGNAL_FIELDS)
+    return any(getattr(behavior_data, name, None) for name in _BEHAVIOR_SIGNAL_FIELDS)
+
+
+def _predict_submission_load(
+    cognitive_load_features,
+    correct_count: int,
+    total_questions: int
+) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Predict cognitive load for a quiz submission.
+
+    Synchronous (model inference is CPU-bound), so _insert_scored_result runs it in
+    a worker thread before the result insert.
+
+    Returns:
+        Tuple of (cognitive_load, confidence), both None if prediction failed
+    """
+    cognitive_load = None
+    cognitive_load_confidence = None
+
+    # Score features are calculated from the quiz results to ensure consistency;
+    # these override any provided values
+    scored = {
+        'totalScore': float(correct_count),
+        'accuracyRate': float(correct_count / total_questions) if total_questions > 0 else 0.0,
+        'errors': float(total_questions - correct_count)
+    }
+    
+    # Extract answerChanges before try block for fallback
+    if isinstance(cognitive_load_features, dict):
+        answer_changes = cognitive_load_features.get('answerChanges', 0.0)
+    else:
+        answer_changes = getattr(cognitive_load_features, 'answerChanges', 0.0)
+    
+    try:
+        answer_changes = float(answer_changes)
+        if isinstance(cognitive_load_features, dict):
+            # Fill in defaults for any feature the client didn't send
+            features = {**_DEFAULT_FEATURES, **cognitive_load_features, **scored}
+        else:
+            # The features schema carries every field; the predictor reads attributes,
+            # so only copy it with the score overrides rather than model_dump() it
+            features = cognitive_load_features.model_copy(update=scored)
+        
+        # Predict cognitive load using the model (with fallback if model unavailable)
+        predicted_load, confidence, confidence_scores = predict_cognitive_load(features)
+        cognitive_load = predicted_load
+        cognitive_load_confidence = confidence
+        logger.info("Predicted cognitive load: %s (confidence: %.4f)", cognitive_load, confidence)
+        logger.debug(
+            "Confidence scores: Low=%.2f%%, Medium=%.2f%%, High=%.2f%%",
+            confidence_scores['Low'] * 100, confidence_scores['Medium'] * 100, confidence_scores['High'] * 100
+        )
+    except Exception as e:
+        logger.warning("Error predicting cognitive load: %s", e)
+        # Try fallback prediction with minimal features
+        try:
+            fallback_features = {**_DEFAULT_FEATURES, 'answerChanges': answer_changes, **scored}
+            predicted_load, confidence, _ = predict_cognitive_load(fallback_features)
+            cognitive_load = predicted_load
+            cognitive_load_confidence = confidence
+            logger.info("Used fallback prediction: %s (confidence: %.4f)", cognitive_load, confidence)
+        except Exception as fallback_error:
+            logger.warning("Fallback prediction also failed: %s", fallback_error)
+            # Continue without prediction if all methods fail
+
+    return cognitive_load, cognitive_load_confidence
+
+
+async def _insert_scored_result(
+    result: QuizResult,
+    cognitive_load_features,
+    correct_count: int,
+    total_questions: int
+) -> None:
+    """
+    Predict cognitive load (if features were sent) and insert the result once, with
+    the prediction already on it.
+    """
+    if cognitive_load_features:
+        result.cognitive_load, result.cognitive_load_confidence = await asyncio.to_thread(
+            _predict_submission_load, cognitive_load_features, correct_count, total_questions
+        )
+    await result.insert()
+
+
+# Opt-in SQLite cache of generated questions (settings.QUIZ_CACHE_PATH), opened on first use.
+# One connection shared across threads, serialized by the lock.
+_quiz_cache_db: Optional[sqlite3.Connection] = None
+_quiz_cache_lock = threading.Lock()
+
+
+def _quiz_cache() -> Optional[sqlite3.Connection]:
+    """The quiz cache connection, or None if caching is disabled"""
+    global _quiz_cache_db
+    if not settings.QUIZ_CACHE_PATH:
+        return None
+    with _quiz_cache_lock:
+        if _quiz_cache_db is None:
+            db = sqlite3.connect(settings.QUIZ_CACHE_PATH, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS qcache (k TEXT PRIMARY KEY, v TEXT NOT NULL)")
+            _quiz_cache_db = db
+    return _quiz_cache_db
+
+
+def _generation_kwargs(target_load: str, num_questions: int) -> Dict:
+    """Generator arguments shared by the single and batch paths (configured ML settings)"""
+    return {
+        'num_questions': num_questions,
+        'target_load': target_load,
+        'use_ml': settings.QUIZ_USE_ML,
+        'use_spacy': settings.QUIZ_USE_SPACY,
+        'encoder_backend': settings.QUIZ_ENCODER_BACKEND,
+    }
+
+
+def _quiz_cache_key(content: str, target_load: str, num_questions: int) -> str:
+    key_prefix = (
+        f"{num_questions}|{target_load}|{settings.QUIZ_USE_ML}|"
+        f"{settings.QUIZ_USE_SPACY}|{settings.QUIZ_ENCODER_BACKEND}|"
+    )
+    return hashlib.sha256((key_prefix + content).encode("utf-8")).hexdigest()
+
+
+def _quiz_cache_get(db: sqlite3.Connection, key: str) -> Optional[List[Dict]]:
+    """Cached questions for key with fresh question ids (each quiz needs its own), or None"""
+    try:
+        with _quiz_cache_lock:
+            row = db.execute("SELECT v FROM qcache WHERE k = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("Quiz cache read failed: %s", e)
+        return None
+    return reissue_question_ids(json.loads(row[0])) if row else None
+
+
+def _quiz_cache_put(db: sqlite3.Connection, key: str, questions: List[Dict]) -> None:
+    try:
+        with _quiz_cache_lock:
+            db.execute("INSERT OR REPLACE INTO qcache (k, v) VALUES (?, ?)", (key, json.dumps(questions)))
+            db.commit()
+    except sqlite3.Error as e:
+        logger.warning("Quiz cache write failed: %s", e)
+
+
+def _generate_questions(content: str, target_load: str, num_questions: int = 10) -> List[Dict]:
+    """
+    generate_quiz_from_content with the configured ML settings, served from the
+    SQLite cache when enabled and the same content was generated before.
+    """
+    db = _quiz_cache()
+    if db is None:
+        return generate_quiz_from_content(content=content, **_generation_kwargs(target_load, num_questions))
+
+    key = _quiz_cache_key(content, target_load, num_questions)
+    questions = _quiz_cache_get(db, key)
+    if questions is None:
+        questions = generate_quiz_from_content(content=content, **_generation_kwargs(target_load, num_questions))
+        _quiz_cache_put(db, key, questions)
+    return questions
+
+
+def _generate_questions_batch(contents: List[str], target_load: str, num_questions: int = 10) -> List[List[Dict]]:
+    """
+    generate_quizzes_from_contents through the same SQLite cache as _generate_questions:
+    only the lessons without a cached quiz are generated, as one batch.
+    """
+    db = _quiz_cache()
+    if db is None:
+        return generate_quizzes_from_contents(contents, **_generation_kwargs(target_load, num_questions))
+
+    keys = [_quiz_cache_key(content, target_load, num_questions) for content in contents]
+    results = [_quiz_cache_get(db, key) for key in keys]
+    misses = [i for i, questions in enumerate(results) if questions is None]
+    if misses:
+        generated = generate_quizzes_from_contents(
+            [contents[i] for i in misses], **_generation_kwargs(target_load, num_questions)
+        )
+        for i, questions in zip(misses, generated):
+            _quiz_cache_put(db, keys[i], questions)
+            results[i] = questions
+    return results
+
+
+def _quiz_target_load(lesson: Lesson) -> str:
+    """Quiz target load from the lesson's baseline cognitive load snapshot"""
+    baseline = (lesson.baseline_cognitive_load or "OPTIMAL").strip().upper()
+    if baseline == "LOW_LOAD":
+        baseline = "LOW"
+    if baseline not in {"OVERLOAD", "OPTIMAL", "LOW"}:
+        baseline = "OPTIMAL"
+    return baseline
+
+
 async def generate_quiz_for_lesson(
     lesson_id: PydanticObjectId,
     user_id: PydanticObjectId,
@@ -36,18 +275,7 @@ async def generate_quiz_for_lesson(
     if lesson.user_id != user_id:
         raise ValueError("Lesson does not belong to user")
 
-    baseline = (lesson.baseline_cognitive_load or "OPTIMAL").strip().upper()
-    if baseline == "LOW_LOAD":
-        baseline = "LOW"
-    if baseline not in {"OVERLOAD", "OPTIMAL", "LOW"}:
-        baseline = "OPTIMAL"
-
-    questions = generate_quiz_from_content(
-        content=lesson.content,
-        num_questions=10,
-        target_load=baseline,
-        use_ml=settings.QUIZ_USE_ML,
-    )
+    questions = _generate_questions(lesson.content, _quiz_target_load(lesson), num_questions=10)
 
     quiz = Quiz(
         lesson_id=lesson_id,
@@ -59,6 +287,61 @@ async def generate_quiz_for_lesson(
     return quiz
 
 
+async def bulk_generate_quizzes(
+    lesson_ids: List[PydanticObjectId],
+    user_id: PydanticObjectId,
+    num_questions: int = 10
+) -> List[Quiz]:
+    """
+    Generate one quiz per lesson, as generate_quiz_for_lesson does, but fetch the
+    lessons in one query, generate per target load in batches and store every quiz
+    with a single insert_many. A lesson listed more than once gets one quiz.
+
+    Returns:
+        Quiz documents in the order of lesson_ids (first occurrence)
+
+    Raises:
+        ValueError: If a lesson is not found or doesn't belong to user
+    """
+    lesson_ids = list(dict.fromkeys(lesson_ids))
+    lessons = await Lesson.find(In(Lesson.id, lesson_ids)).to_list()
+    lessons_by_id = {lesson.id: lesson for lesson in lessons}
+    for lesson_id in lesson_ids:
+        lesson = lessons_by_id.get(lesson_id)
+        if not lesson:
+            raise ValueError(f"Lesson with ID {lesson_id} not found")
+        if lesson.user_id != user_id:
+            raise ValueError("Lesson does not belong to user")
+
+    # Lessons sharing a target load are generated together
+    ids_by_load: Dict[str, List[PydanticObjectId]] = defaultdict(list)
+    for lesson_id in lesson_ids:
+        ids_by_load[_quiz_target_load(lessons_by_id[lesson_id])].append(lesson_id)
+
+    # spaCy + encoder work is CPU-bound; keep it off the event loop
+    questions_by_id: Dict[PydanticObjectId, List[Dict]] = {}
+    for target_load, load_ids in ids_by_load.items():
+        generated = await asyncio.to_thread(
+            _generate_questions_batch,
+            [lessons_by_id[lesson_id].content for lesson_id in load_ids],
+            target_load,
+            num_questions=10,
+        )
+        questions_by_id.update(zip(load_ids, generated))
+
+    quizzes = [
+        Quiz(lesson_id=lesson_id, user_id=user_id, questions=questions_by_id[lesson_id])
+        for lesson_id in lesson_ids
+    ]
+    if not quizzes:
+        return quizzes
+
+    inserted = await Quiz.insert_many(quizzes, ordered=False)
+    for quiz, quiz_id in zip(quizzes, inserted.inserted_ids):
+        quiz.id = quiz_id
+    return quizzes
+
+
 async def get_quiz(quiz_id: PydanticObjectId, user_id: PydanticObjectId) -> Quiz:
     """
     Get a quiz by ID
@@ -83,6 +366,57 @@ async def get_quiz(quiz_id: PydanticObjectId, user_id: PydanticObjectId) -> Quiz
     return quiz
 
 
+async def _log_submission_behavior(
+    quiz: Quiz,
+    quiz_id: PydanticObjectId,
+    user_id: PydanticObjectId,
+    behavior_data,
+    answers: List[Dict],
+    result: QuizResult
+) -> Optional[BehaviorLog]:
+    """
+    Create the behavior log for a submission. Errors are logged and swallowed so a
+    behavior-log failure never fails the submission itself.
+
+    Returns:
+        The inserted BehaviorLog, or None if logging failed
+    """
+    try:
+        # lesson_id comes from the quiz already fetched by the caller
+        lesson_id = quiz.lesson_id
+        
+        # Convert behavior_data to dict if it's a Pydantic model
+        if hasattr(behavior_data, 'model_dump'):
+            behavior_dict = behavior_data.model_dump()
+        else:
+            behavior_dict = behavior_data
+        
+        # Add question interactions from answers if not provided
+        if 'question_interactions' not in behavior_dict or not behavior_dict['question_interactions']:
+            behavior_dict['question_interactions'] = []
+            for ans in answers:
+                if isinstance(ans, dict):
+                    behavior_dict['question_interactions'].append({
+                        'question_id': ans.get('question_id'),
+                        'answer_index': ans.get('answer_index')
+                    })
+        
+        # Create the behavior log with this submission's result already applied,
+        # so it is written once instead of inserted and then re-read and saved
+        return await create_behavior_log(
+            quiz_id=quiz_id,
+            user_id=user_id,
+            lesson_id=lesson_id,
+            session_data=behavior_dict,
+            quiz=quiz,
+            quiz_result=result
+        )
+    except Exception as e:
+        logger.warning("Error logging behavior: %s", e)
+        # Continue even if behavior logging fails
+        return None
+
+
 async def submit_quiz_answers(
     quiz_id: PydanticObjectId,
     user_id: PydanticObjectId,
@@ -103,6 +437,7 @@ async def submit_quiz_answers(
         answers: List of answer dictionaries with 'question_id' and 'answer_index'
         behavior_data: Optional behavior data for logging
         cognitive_load_features: Optional raw features for cognitive load prediction
+            (dict, or the request schema - read by attribute, no model_dump needed)
 
     Returns:
         QuizResult document
@@ -114,103 +449,27 @@ async def submit_quiz_answers(
     quiz = await get_quiz(quiz_id, user_id)
     
     # Calculate score
-    correct_count = 0
     total_questions = len(quiz.questions)
     
-    # Create answer map for quick lookup
-    # Handle both dict and Pydantic model formats
-    answer_map = {}
-    for ans in answers:
-        if isinstance(ans, dict):
-            answer_map[ans.get('question_id')] = ans.get('answer_index')
-        else:
-            # Pydantic model
-            answer_map[ans.question_id] = ans.answer_index
+    # Create answer map for quick lookup (dict or Pydantic model answers)
+    answer_map = dict(map(_answer_pair, answers))
     
-    # Check each question
-    for question in quiz.questions:
-        question_id = question.get('id')
-        user_answer = answer_map.get(question_id)
-        correct_answer = question.get('correct_index')
-        
-        if user_answer is not None and user_answer == correct_answer:
-            correct_count += 1
+    # Count submitted answers that match the stored correct index; only the answered
+    # questions are checked, not every question in the quiz
+    correct_map = {question.get('id'): question.get('correct_index') for question in quiz.questions}
+    correct_count = sum(
+        1 for question_id, user_answer in answer_map.items()
+        if user_answer is not None and correct_map.get(question_id) == user_answer
+    )
     
     # Calculate score (percentage)
     score = (correct_count / total_questions) * 100 if total_questions > 0 else 0
     
-    # Convert answers to dict format for storage
-    answers_dict = []
-    for ans in answers:
-        if isinstance(ans, dict):
-            answers_dict.append(ans)
-        else:
-            answers_dict.append({
-                'question_id': ans.question_id,
-                'answer_index': ans.answer_index
-            })
-    
-    # Predict cognitive load if features provided
-    cognitive_load = None
-    cognitive_load_confidence = None
-    if cognitive_load_features:
-        # Convert Pydantic model to dict if needed (outside try block for fallback)
-        if hasattr(cognitive_load_features, 'model_dump'):
-            features_dict = cognitive_load_features.model_dump()
-        else:
-            features_dict = cognitive_load_features.copy() if isinstance(cognitive_load_features, dict) else {}
-        
-        # Extract answerChanges before try block for fallback
-        answer_changes = float(features_dict.get('answerChanges', 0.0))
-        
-        try:
-            # Calculate required features from quiz results to ensure consistency
-            # These override any provided values to match actual quiz results
-            features_dict['totalScore'] = float(correct_count)
-            features_dict['accuracyRate'] = float(correct_count / total_questions) if total_questions > 0 else 0.0
-            features_dict['errors'] = float(total_questions - correct_count)
-            
-            # Ensure all required features have default values if missing
-            required_features = {
-                'answerChanges': answer_changes,
-                'currentErrorStreak': 0.0,
-                'idleGapsOverThreshold': 0.0,
-                'responseTimeVariability': 0.0,
-                'completionTime': 0.0,
-                'avgResponseTime': 0.0
-            }
-            for feature, default_value in required_features.items():
-                if feature not in features_dict:
-                    features_dict[feature] = default_value
-            
-            # Predict cognitive load using the model (with fallback if model unavailable)
-            predicted_load, confidence, confidence_scores = predict_cognitive_load(features_dict)
-            cognitive_load = predicted_load
-            cognitive_load_confidence = confidence
-            print(f"✅ Predicted cognitive load: {cognitive_load} (confidence: {confidence:.4f})")
-            print(f"   Confidence scores: Low={confidence_scores['Low']:.2%}, Medium={confidence_scores['Medium']:.2%}, High={confidence_scores['High']:.2%}")
-        except Exception as e:
-            print(f"⚠️  Error predicting cognitive load: {str(e)}")
-            # Try fallback prediction with minimal features
-            try:
-                fallback_features = {
-                    'totalScore': float(correct_count),
-                    'accuracyRate': float(correct_count / total_questions) if total_questions > 0 else 0.0,
-                    'errors': float(total_questions - correct_count),
-                    'answerChanges': answer_changes,
-                    'currentErrorStreak': 0.0,
-                    'idleGapsOverThreshold': 0.0,
-                    'responseTimeVariability': 0.0,
-                    'completionTime': 0.0,
-                    'avgResponseTime': 0.0
-                }
-                predicted_load, confidence, _ = predict_cognitive_load(fallback_features)
-                cognitive_load = predicted_load
-                cognitive_load_confidence = confidence
-                print(f"✅ Used fallback prediction: {cognitive_load} (confidence: {confidence:.4f})")
-            except Exception as fallback_error:
-                print(f"⚠️  Fallback prediction also failed: {str(fallback_error)}")
-                # Continue without prediction if all methods fail
+    # Store the answers in dict format, one per question as scored
+    answers_dict = [
+        {'question_id': question_id, 'answer_index': answer_index}
+        for question_id, answer_index in answer_map.items()
+    ]
     
     # Create quiz result
     result = QuizResult(
@@ -219,50 +478,26 @@ async def submit_quiz_answers(
         answers=answers_dict,
         score=score,
         correct_count=correct_count,
-        total_questions=total_questions,
-        cognitive_load=cognitive_load,
-        cognitive_load_confidence=cognitive_load_confidence
+        total_questions=total_questions
     )
     
-    # Save to database
-    await result.insert()
-    
-    # Log behavior data if provided
-    if behavior_data:
-        try:
-            # Get lesson_id from quiz
-            quiz = await get_quiz(quiz_id, user_id)
-            lesson_id = quiz.lesson_id
-            
-            # Convert behavior_data to dict if it's a Pydantic model
-            if hasattr(behavior_data, 'model_dump'):
-                behavior_dict = behavior_data.model_dump()
-            else:
-                behavior_dict = behavior_data
-            
-            # Add question interactions from answers if not provided
-            if 'question_interactions' not in behavior_dict or not behavior_dict['question_interactions']:
-                behavior_dict['question_interactions'] = []
-                for ans in answers:
-                    if isinstance(ans, dict):
-                        behavior_dict['question_interactions'].append({
-                            'question_id': ans.get('question_id'),
-                            'answer_index': ans.get('answer_index')
-                        })
-            
-            # Create or update behavior log
-            await create_behavior_log(
-                quiz_id=quiz_id,
-                user_id=user_id,
-                lesson_id=lesson_id,
-                session_data=behavior_dict
-            )
-            
-            # Update behavior log with quiz results
-            await update_behavior_log_with_results(quiz_id, user_id)
-        except Exception as e:
-            print(f"⚠️  Error logging behavior: {str(e)}")
-            # Continue even if behavior logging fails
+    # Predict cognitive load (if features provided) and save the result in one insert,
+    # while the behavior log (if it has any signal) is written alongside. The log
+    # doesn't need the result's _id or cognitive load, so the round trips overlap.
+    writes = [_insert_scored_result(result, cognitive_load_features, correct_count, total_questions)]
+    if behavior_data and _has_behavior_signal(behavior_data):
+        writes.append(_log_submission_behavior(quiz, quiz_id, user_id, behavior_data, answers, result))
+    insert_outcome, *log_outcome = await asyncio.gather(*writes, return_exceptions=True)
+    if isinstance(insert_outcome, BaseException):
+        # The result was never stored: don't keep a behavior log scored against it
+        behavior_log = log_outcome[0] if log_outcome else None
+        if isinstance(behavior_log, BehaviorLog):
+            try:
+                await behavior_log.delete()
+            except Exception as e:
+                logger.warning("Error removing behavior log for failed submission: %s", e)
+        raise insert_outcome
+    cognitive_load = result.cognitive_load
 
     # Update the user's baseline_cognitive_load using the same normalization
     # logic as the /v1/predict endpoint (LOW / OPTIMAL / OVERLOAD).
@@ -281,7 +516,7 @@ async def submit_quiz_answers(
                 user.baseline_cognitive_load = state
                 await user.save()
         except Exception as e:
-            print(f"⚠️  Error updating user baseline cognitive load: {str(e)}")
+            logger.warning("Error updating user baseline cognitive load: %s", e)
 
     return result
 
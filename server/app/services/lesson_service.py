@@ -8,13 +8,21 @@ from app.schemas.audio_haptics.lesson import LessonCreate, LessonResponse
 from app.models.user import User
 
 
+# Response fields copied as-is from the stored document (ids are stringified separately)
+_LESSON_RESPONSE_FIELDS = tuple(
+    name for name in LessonResponse.model_fields if name not in ("id", "user_id")
+)
+
+
 def lesson_to_response(lesson: Lesson) -> LessonResponse:
     """Convert Lesson document to LessonResponse schema"""
-    lesson_dict = lesson.model_dump()
-    lesson_dict["id"] = str(lesson.id)
-    lesson_dict["user_id"] = str(lesson.user_id)
-    lesson_dict.pop("_id", None)
-    return LessonResponse.model_validate(lesson_dict)
+    # The document was validated on load, so build the response without a
+    # model_dump() + model_validate() round-trip
+    return LessonResponse.model_construct(
+        id=str(lesson.id),
+        user_id=str(lesson.user_id),
+        **{name: getattr(lesson, name) for name in _LESSON_RESPONSE_FIELDS},
+    )
 
 
 async def create_lesson(
@@ -16,37 +16,19 @@ import numpy as np
 from beanie import PydanticObjectId
 from sklearn.feature_extraction.text import TfidfVectorizer
 
-try:
-    import spacy
-except ImportError:  # pragma: no cover - handled gracefully at runtime
-    spacy = None  # type: ignore
-
 try:
     import textstat  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     textstat = None  # type: ignore
 
+from app.ml.utils import get_spacy_nlp
 from app.models.cognitive_load.content import TransmutedContent
 from app.models.user import User
 from app.services.nlp.text_llm_client import generate_text
 
 
-_NLP = None
-
-
-def _get_nlp():
-    """Lazy‑load spaCy English model; degrade gracefully if unavailable."""
-    global _NLP
-    if _NLP is not None:
-        return _NLP
-    if spacy is None:
-        return None
-    try:
-        _NLP = spacy.load("en_core_web_sm")
-    except Exception:
-        # Model not installed – caller will fall back to safe defaults.
-        _NLP = None
-    return _NLP
+# Documents per spaCy batch when analysing several texts at once
+_NLP_BATCH_SIZE = 32
 
 
 def _compute_flesch_kincaid_grade(text: str) -> float:
@@ -69,29 +51,56 @@ def _compute_flesch_kincaid_grade(text: str) -> float:
     return float(max(0.0, min(18.0, approx_grade)))
 
 
-def _compute_dependency_distance(text: str) -> float:
-    """Average normalized dependency distance as a proxy for syntactic load."""
-    nlp = _get_nlp()
+def _compute_dependency_distances(texts: List[str]) -> List[float]:
+    """
+    Average normalized dependency distance (a proxy for syntactic load) for each
+    text, parsed as one batch through nlp.pipe.
+    """
+    # Shared spaCy model (None if not installed – fall back to safe defaults)
+    nlp = get_spacy_nlp()
     if nlp is None:
+        return [0.0] * len(texts)
+    return [
+        _doc_dependency_distance(doc)
+        for doc in nlp.pipe(texts, batch_size=_NLP_BATCH_SIZE)
+    ]
+
+
+def _doc_dependency_distance(doc) -> float:
+    """
+    Average normalized dependency distance of a parsed spaCy Doc: for each ROOT with
+    children, the gap to its farthest child, averaged over roots. Works on the
+    (HEAD, DEP) arrays from doc.to_array rather than walking Token objects.
+    """
+    from spacy.attrs import DEP, HEAD
+
+    n_tokens = len(doc)
+    if not n_tokens:
         return 0.0
-    doc = nlp(text)
-    distances: List[float] = []
-    for sent in doc.sents:
-        roots = [t for t in sent if t.dep_ == "ROOT"]
-        for root in roots:
-            if not list(root.children):
-                continue
-            max_gap = max(abs(child.i - root.i) for child in root.children)
-            distances.append(float(max_gap))
-    if not distances:
+    attrs = doc.to_array([HEAD, DEP])
+    # HEAD is the offset to the token's head (0 for a ROOT), stored unsigned
+    offsets = attrs[:, 0].astype(np.int64)
+    is_root = attrs[:, 1] == doc.vocab.strings["ROOT"]
+    heads = np.arange(n_tokens) + offsets
+    # Tokens attached to a ROOT (the ROOT itself is its own head, offset 0)
+    root_children = (offsets != 0) & is_root[heads]
+    if not root_children.any():
         return 0.0
-    avg_distance = float(np.mean(distances))
+    # Farthest child per root: group children by head index, then one reduceat
+    # (np.maximum.at is an unbuffered per-element loop)
+    child_heads = heads[root_children]
+    order = np.argsort(child_heads, kind="stable")
+    child_heads = child_heads[order]
+    gaps = np.abs(offsets[root_children])[order]
+    group_starts = np.flatnonzero(np.r_[True, child_heads[1:] != child_heads[:-1]])
+    avg_distance = float(np.maximum.reduceat(gaps, group_starts).mean())
     # Normalize by a conservative upper bound (25 tokens apart).
     return float(max(0.0, min(1.0, avg_distance / 25.0)))
 
 
 def _extract_keywords_tfidf(text: str, top_k: int = 10) -> List[str]:
-    """TF‑IDF keyword extraction on a single document."""
+    """TF‑IDF keyword extraction on a single document. Keywords come back lowercased
+    (the vectorizer's default), so callers need not lower them again."""
     cleaned = (text or "").strip()
     if not cleaned:
         return []
@@ -123,18 +132,25 @@ class AnalysisResult:
 
 def analyze_text(text: str) -> AnalysisResult:
     """Phase 1 – deterministic NLP analysis."""
-    fk_grade = _compute_flesch_kincaid_grade(text)
-    dep_dist = _compute_dependency_distance(text)
-    # Normalize grade to [0, 1] using an 18‑grade cap (roughly grad‑school ceiling).
-    grade_norm = fk_grade / 18.0 if fk_grade > 0 else 0.0
-    complexity = float(max(0.0, min(1.0, 0.6 * grade_norm + 0.4 * dep_dist)))
-    keywords = _extract_keywords_tfidf(text)
-    return AnalysisResult(
-        flesch_kincaid_grade=fk_grade,
-        dependency_distance=dep_dist,
-        complexity_score=complexity,
-        keywords=keywords,
-    )
+    return analyze_texts([text])[0]
+
+
+def analyze_texts(texts: List[str]) -> List[AnalysisResult]:
+    """Phase 1 for several texts, sharing one batched spaCy pass."""
+    results: List[AnalysisResult] = []
+    for text, dep_dist in zip(texts, _compute_dependency_distances(texts)):
+        fk_grade = _compute_flesch_kincaid_grade(text)
+        # Normalize grade to [0, 1] using an 18‑grade cap (roughly grad‑school ceiling).
+        grade_norm = fk_grade / 18.0 if fk_grade > 0 else 0.0
+        complexity = float(max(0.0, min(1.0, 0.6 * grade_norm + 0.4 * dep_dist)))
+        keywords = _extract_keywords_tfidf(text)
+        results.append(AnalysisResult(
+            flesch_kincaid_grade=fk_grade,
+            dependency_distance=dep_dist,
+            complexity_score=complexity,
+            keywords=keywords,
+        ))
+    return results
 
 
 def _infer_topic_and_title(raw_text: str, analysis: AnalysisResult) -> Tuple[str, str]:
@@ -147,9 +163,8 @@ def _infer_topic_and_title(raw_text: str, analysis: AnalysisResult) -> Tuple[str
     topic = ""
     # Prefer gravity-related terms when present, since many physics texts like this use
     # both "force" and "gravity" but the pedagogical concept is gravity.
-    lower_keywords = [k.lower() for k in analysis.keywords]
     gravity_keywords = [
-        k for k in lower_keywords if "gravity" in k or "gravitational" in k
+        k for k in analysis.keywords if "gravity" in k or "gravitational" in k
     ]
     if gravity_keywords:
         topic = gravity_keywords[0].strip().title()
@@ -225,12 +240,13 @@ Tier 2 - Moderate Simplification:
 The following terms are core and MUST remain present in some form in your answer:
 {keywords_str}
 """
-    return (
-        base_instructions
-        + tier_instructions
-        + keyword_hint
-        + f"\nOriginal text:\n\"\"\"{text.strip()}\"\"\"\n\nTransformed text:"
-    )
+    # One join sized for the final prompt instead of a chain of + temporaries
+    return "".join((
+        base_instructions,
+        tier_instructions,
+        keyword_hint,
+        f"\nOriginal text:\n\"\"\"{text.strip()}\"\"\"\n\nTransformed text:",
+    ))
 
 
 def _compute_keyword_preservation(
@@ -247,7 +263,7 @@ def _compute_keyword_preservation(
     kept: List[str] = []
     dropped: List[str] = []
     for kw in original_keywords:
-        token = kw.lower().strip()
+        token = kw.strip()  # TF-IDF keywords are already lowercase
         if not token:
             continue
         parts = token.split()
@@ -263,13 +279,17 @@ def _compute_keyword_preservation(
     return kept, dropped
 
 
-def transmute_text(text: str, cognitive_state: str) -> dict:
+def transmute_text(
+    text: str, cognitive_state: str, analysis: Optional[AnalysisResult] = None
+) -> dict:
     """
     Public orchestrator used by the FastAPI endpoint.
 
-    Returns a dict ready to be fed into TransmuteResponse.
+    Pass `analysis` when the caller has already analysed `text` to skip a second
+    spaCy/TF-IDF pass. Returns a dict ready to be fed into TransmuteResponse.
     """
-    analysis = analyze_text(text)
+    if analysis is None:
+        analysis = analyze_text(text)
     tier = _route_tier(cognitive_state, analysis.complexity_score)
     prompt = _build_prompt(text, tier, analysis.keywords)
     llm_error: Optional[str] = None
@@ -309,7 +329,7 @@ async def log_transmutation_event(
     """
     # Analysis on original text (for input + quality metrics)
     original_analysis = analyze_text(text)
-    result = transmute_text(text, cognitive_state)
+    result = transmute_text(text, cognitive_state, analysis=original_analysis)
     # Analysis on transmuted text to compute complexity reduction
     post_analysis = analyze_text(result["transmuted_text"])
 
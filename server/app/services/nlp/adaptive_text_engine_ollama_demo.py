@@ -16,11 +16,6 @@ import numpy as np
 from beanie import PydanticObjectId
 from sklearn.feature_extraction.text import TfidfVectorizer
 
-try:
-    import spacy
-except ImportError: 
-    spacy = None  
-
 try:
     import textstat  
 except ImportError:  
@@ -28,26 +23,10 @@ except ImportError:
 
 from app.models.cognitive_load.content import TransmutedContent
 from app.models.user import User
+from app.ml.utils import get_spacy_nlp
 from app.services.nlp.text_llm_client_ollama_demo import generate_text
 
 
-_NLP = None
-
-
-def _get_nlp():
-    """Lazy‑load spaCy English model; degrade gracefully if unavailable."""
-    global _NLP
-    if _NLP is not None:
-        return _NLP
-    if spacy is None:
-        return None
-    try:
-        _NLP = spacy.load("en_core_web_sm")
-    except Exception:
-        # Model not installed – caller will fall back to safe defaults.
-        _NLP = None
-    return _NLP
-
 #difficulty of the text.
 def _compute_flesch_kincaid_grade(text: str) -> float:
     """Compute Flesch‑Kincaid grade with safe fallback."""
@@ -71,7 +50,8 @@ def _compute_flesch_kincaid_grade(text: str) -> float:
 #how complex the sentence structure
 def _compute_dependency_distance(text: str) -> float:
     """Average normalized dependency distance as a proxy for syntactic load."""
-    nlp = _get_nlp()
+    # Shared spaCy model (None if not installed – fall back to safe defaults)
+    nlp = get_spacy_nlp()
     if nlp is None:
         return 0.0
     doc = nlp(text)
@@ -91,7 +71,8 @@ def _compute_dependency_distance(text: str) -> float:
 
 #detect the core scientific terms
 def _extract_keywords_tfidf(text: str, top_k: int = 10) -> List[str]:
-    """TF‑IDF keyword extraction on a single document."""
+    """TF‑IDF keyword extraction on a single document. Keywords come back lowercased
+    (the vectorizer's default), so callers need not lower them again."""
     cleaned = (text or "").strip()
     if not cleaned:
         return []
@@ -147,9 +128,8 @@ def _infer_topic_and_title(raw_text: str, analysis: AnalysisResult) -> Tuple[str
     topic = ""
     # Prefer gravity-related terms when present, since many physics texts like this use
     # both "force" and "gravity" but the pedagogical concept is gravity.
-    lower_keywords = [k.lower() for k in analysis.keywords]
     gravity_keywords = [
-        k for k in lower_keywords if "gravity" in k or "gravitational" in k
+        k for k in analysis.keywords if "gravity" in k or "gravitational" in k
     ]
     if gravity_keywords:
         topic = gravity_keywords[0].strip().title()
@@ -247,7 +227,7 @@ def _compute_keyword_preservation(
     kept: List[str] = []
     dropped: List[str] = []
     for kw in original_keywords:
-        token = kw.lower().strip()
+        token = kw.strip()  # TF-IDF keywords are already lowercase
         if not token:
             continue
         parts = token.split()
@@ -263,13 +243,17 @@ def _compute_keyword_preservation(
     return kept, dropped
 
 
-def transmute_text(text: str, cognitive_state: str) -> dict:
+def transmute_text(
+    text: str, cognitive_state: str, analysis: Optional[AnalysisResult] = None
+) -> dict:
     """
     Public orchestrator used by the FastAPI endpoint.
 
-    Returns a dict ready to be fed into TransmuteResponse.
+    Pass `analysis` when the caller has already analysed `text` to skip a second
+    spaCy/TF-IDF pass. Returns a dict ready to be fed into TransmuteResponse.
     """
-    analysis = analyze_text(text)
+    if analysis is None:
+        analysis = analyze_text(text)
     tier = _route_tier(cognitive_state, analysis.complexity_score)
     prompt = _build_prompt(text, tier, analysis.keywords)
     llm_error: Optional[str] = None
@@ -309,7 +293,7 @@ async def log_transmutation_event(
     """
     # Analysis on original text (for input + quality metrics)
     original_analysis = analyze_text(text)
-    result = transmute_text(text, cognitive_state)
+    result = transmute_text(text, cognitive_state, analysis=original_analysis)
     # Analysis on transmuted text to compute complexity reduction
     post_analysis = analyze_text(result["transmuted_text"])
 
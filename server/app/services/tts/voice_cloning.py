@@ -10,19 +10,17 @@ Requires: coqui-tts, torch, transformers. Optional: set COQUI_TOS_AGREED=1 to sk
 
 from __future__ import annotations
 
+import io
 import os
 import tempfile
+import wave
 from pathlib import Path
 
+import numpy as np
+
 # Accept Coqui CPML (non-commercial) so the app can run without prompting [y/n]
 os.environ.setdefault("COQUI_TOS_AGREED", "1")
 
-# Mac / transformers: patch before any TTS import (TTS imports transformers.pytorch_utils.isin_mps_friendly)
-import torch
-import transformers
-if not hasattr(transformers.pytorch_utils, "isin_mps_friendly"):
-    transformers.pytorch_utils.isin_mps_friendly = torch.isin
-
 # Lazy model instance
 _tts_model = None
 
@@ -32,6 +30,14 @@ def _get_model():
     global _tts_model
     if _tts_model is not None:
         return _tts_model
+    # torch / transformers / TTS are imported here rather than at module load, so
+    # workers that never clone a voice don't pay their import time and memory
+    import torch
+    import transformers
+
+    # Mac / transformers: patch before any TTS import (TTS imports transformers.pytorch_utils.isin_mps_friendly)
+    if not hasattr(transformers.pytorch_utils, "isin_mps_friendly"):
+        transformers.pytorch_utils.isin_mps_friendly = torch.isin
     from TTS.api import TTS
 
     # Use CPU when CUDA not available (avoids MPS/experimental GPU math bugs on Mac)
@@ -67,19 +73,28 @@ def synthesize_cloned(
         raise FileNotFoundError(f"Speaker WAV not found: {speaker_wav_path}")
 
     model = tts if tts is not None else _get_model()
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-        out_path = f.name
-    try:
-        model.tts_to_file(
-            text=text.strip(),
-            speaker_wav=str(path),
-            file_path=out_path,
-            language=language,
-        )
-        with open(out_path, "rb") as f:
-            return f.read()
-    finally:
-        Path(out_path).unlink(missing_ok=True)
+    # Synthesize to samples and encode the WAV in memory, rather than having
+    # tts_to_file write a temp file only to read it back
+    wav = model.tts(
+        text=text.strip(),
+        speaker_wav=str(path),
+        language=language,
+    )
+    return _wav_bytes(wav, model.synthesizer.output_sample_rate)
+
+
+def _wav_bytes(wav, sample_rate: int) -> bytes:
+    """Mono 16-bit PCM WAV bytes, peak-normalized the same way TTS's save_wav is."""
+    samples = np.asarray(wav, dtype=np.float32)
+    if samples.size:
+        samples = samples * (32767 / max(0.01, float(np.max(np.abs(samples)))))
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(samples.astype(np.int16).tobytes())
+    return buf.getvalue()
 
 
 def clone_voice(
@@ -19,6 +19,9 @@ _STOPWORDS: Set[str] = {
     "at", "by", "as", "it", "its",
 }
 
+# Keyword tokens, matched on text that has already been lowercased
+_LOWER_WORD_RE = re.compile(r"[a-z]+")
+
 
 def extract_keywords_from_lesson(lesson: Lesson, min_length: int = 3) -> List[str]:
     """
@@ -43,15 +46,11 @@ def extract_keywords_from_lesson(lesson: Lesson, min_length: int = 3) -> List[st
         text_parts.append(lesson.content.strip())
 
     for text in text_parts:
-        words = re.findall(r"[A-Za-z]+", text)
-        for w in words:
-            lower = w.lower()
-            if (
-                len(lower) >= min_length
-                and lower not in _STOPWORDS
-                and not lower.isdigit()
-            ):
-                keywords.add(lower)
+        # Lowercase each part in one pass rather than every matched word separately
+        keywords.update(
+            word for word in _LOWER_WORD_RE.findall(text.lower())
+            if len(word) >= min_length and word not in _STOPWORDS
+        )
 
     return sorted(keywords)
 
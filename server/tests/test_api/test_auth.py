@@ -0,0 +1,48 @@
+"""
+Auth API tests
+
+Covers request-body validation done by the json_body dependency, which fails before
+any database access, so the router is mounted on a bare FastAPI app.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import auth
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/auth")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/auth/login", "/api/auth/register"])
+def test_malformed_json_body_returns_422_at_body(client, path):
+    response = client.post(
+        path,
+        content=b'{"email": "user@example.com", "password": ',
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert detail and all(error["loc"][0] == "body" for error in detail)
+
+
+def test_missing_field_loc_is_prefixed_with_body(client):
+    response = client.post("/api/auth/login", json={"email": "user@example.com"})
+
+    assert response.status_code == 422
+    assert ["body", "password"] in [error["loc"] for error in response.json()["detail"]]
+
+
+def test_request_schemas_are_documented(client):
+    paths = client.get("/openapi.json").json()["paths"]
+
+    for path, required in (("/api/auth/login", "password"), ("/api/auth/register", "username")):
+        body = paths[path]["post"]["requestBody"]
+        schema = body["content"]["application/json"]["schema"]
+        assert body["required"] is True
+        assert required in schema["required"]
@@ -0,0 +1,65 @@
+"""
+Quiz API tests
+
+The quizzes router is mounted on a bare FastAPI app with the current user overridden
+and the bulk service's Lesson lookup faked, so no database is needed.
+"""
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import quizzes
+from app.services.cognitive_load import quiz_generator as quiz_service
+from app.utils.dependencies import get_current_user
+
+
+USER_ID = PydanticObjectId()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(quizzes.router, prefix="/api/quizzes")
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=USER_ID)
+    return TestClient(app)
+
+
+@pytest.fixture
+def no_lessons(monkeypatch):
+    """Lesson lookups find nothing, and generation must never be reached"""
+
+    class FakeLesson:
+        id = "_id"
+
+        @classmethod
+        def find(cls, *args):
+            class _Query:
+                async def to_list(self):
+                    return []
+
+            return _Query()
+
+    def fail_batch(*args, **kwargs):
+        raise AssertionError("generation should not run for missing lessons")
+
+    monkeypatch.setattr(quiz_service, "Lesson", FakeLesson)
+    monkeypatch.setattr(quiz_service, "_generate_questions_batch", fail_batch)
+
+
+def test_bulk_generate_missing_lesson_returns_404(client, no_lessons):
+    missing = str(PydanticObjectId())
+
+    response = client.post("/api/quizzes/generate/bulk", json={"lesson_ids": [missing, missing]})
+
+    assert response.status_code == 404
+    assert missing in response.json()["detail"]
+
+
+def test_bulk_generate_rejects_empty_lesson_ids(client):
+    response = client.post("/api/quizzes/generate/bulk", json={"lesson_ids": []})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", "lesson_ids"]
@@ -0,0 +1,181 @@
+"""
+Quiz generation service tests
+
+Lesson/Quiz persistence is replaced with in-memory fakes, so these run without MongoDB.
+"""
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.services.cognitive_load import quiz_generator as quiz_service
+
+
+USER_ID = PydanticObjectId()
+
+
+def make_lesson(content: str, user_id: PydanticObjectId = USER_ID, load: str = "OPTIMAL"):
+    return SimpleNamespace(
+        id=PydanticObjectId(),
+        user_id=user_id,
+        content=content,
+        baseline_cognitive_load=load,
+    )
+
+
+class FakeLesson:
+    """Stands in for the Lesson document: find(...).to_list() returns the stored lessons"""
+
+    id = "_id"
+    lessons = []
+
+    @classmethod
+    def find(cls, *args):
+        lessons = cls.lessons
+
+        class _Query:
+            async def to_list(self):
+                return list(lessons)
+
+        return _Query()
+
+
+class FakeQuiz:
+    """Stands in for the Quiz document; insert_many records what would be written"""
+
+    inserted = []
+
+    def __init__(self, lesson_id, user_id, questions):
+        self.id = None
+        self.lesson_id = lesson_id
+        self.user_id = user_id
+        self.questions = questions
+
+    @classmethod
+    async def insert_many(cls, quizzes, ordered=True):
+        cls.inserted.append(list(quizzes))
+        return SimpleNamespace(inserted_ids=[PydanticObjectId() for _ in quizzes])
+
+
+@pytest.fixture
+def fake_storage(monkeypatch):
+    FakeLesson.lessons = []
+    FakeQuiz.inserted = []
+    monkeypatch.setattr(quiz_service, "Lesson", FakeLesson)
+    monkeypatch.setattr(quiz_service, "Quiz", FakeQuiz)
+    return FakeLesson, FakeQuiz
+
+
+@pytest.fixture
+def batch_calls(monkeypatch):
+    """Replace batch generation with one fake question per lesson, recording each call"""
+    calls = []
+
+    def fake_batch(contents, target_load, num_questions=10):
+        calls.append((list(contents), target_load))
+        return [[{"id": f"q-{content}", "question": content}] for content in contents]
+
+    monkeypatch.setattr(quiz_service, "_generate_questions_batch", fake_batch)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_bulk_generate_dedupes_lesson_ids(fake_storage, batch_calls):
+    first, second = make_lesson("first"), make_lesson("second")
+    FakeLesson.lessons = [first, second]
+
+    quizzes = await quiz_service.bulk_generate_quizzes(
+        [first.id, second.id, first.id], USER_ID
+    )
+
+    # One quiz per distinct lesson, in first-occurrence order
+    assert [quiz.lesson_id for quiz in quizzes] == [first.id, second.id]
+    assert batch_calls == [(["first", "second"], "OPTIMAL")]
+    assert len(FakeQuiz.inserted) == 1 and len(FakeQuiz.inserted[0]) == 2
+    assert all(quiz.id is not None for quiz in quizzes)
+
+
+@pytest.mark.asyncio
+async def test_bulk_generate_groups_by_target_load(fake_storage, batch_calls):
+    low, overload = make_lesson("low", load="LOW_LOAD"), make_lesson("heavy", load="OVERLOAD")
+    FakeLesson.lessons = [low, overload]
+
+    await quiz_service.bulk_generate_quizzes([low.id, overload.id], USER_ID)
+
+    assert sorted(batch_calls) == [(["heavy"], "OVERLOAD"), (["low"], "LOW")]
+
+
+@pytest.mark.asyncio
+async def test_bulk_generate_missing_lesson_raises(fake_storage, batch_calls):
+    lesson = make_lesson("present")
+    FakeLesson.lessons = [lesson]
+
+    with pytest.raises(ValueError, match="not found"):
+        await quiz_service.bulk_generate_quizzes([lesson.id, PydanticObjectId()], USER_ID)
+
+    assert batch_calls == []
+    assert FakeQuiz.inserted == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_generate_other_users_lesson_raises(fake_storage, batch_calls):
+    lesson = make_lesson("theirs", user_id=PydanticObjectId())
+    FakeLesson.lessons = [lesson]
+
+    with pytest.raises(ValueError, match="does not belong"):
+        await quiz_service.bulk_generate_quizzes([lesson.id], USER_ID)
+
+    assert FakeQuiz.inserted == []
+
+
+@pytest.fixture
+def quiz_cache(monkeypatch, tmp_path):
+    """Point the SQLite quiz cache at a temp file and count real generations"""
+    monkeypatch.setattr(quiz_service.settings, "QUIZ_CACHE_PATH", str(tmp_path / "quiz_cache.sqlite3"))
+    monkeypatch.setattr(quiz_service, "_quiz_cache_db", None)
+    generated = []
+
+    def fake_generate(content, **kwargs):
+        generated.append(content)
+        return [{"id": f"{content}-{len(generated)}", "question": f"About {content}?"}]
+
+    def fake_generate_batch(contents, **kwargs):
+        return [fake_generate(content, **kwargs) for content in contents]
+
+    monkeypatch.setattr(quiz_service, "generate_quiz_from_content", fake_generate)
+    monkeypatch.setattr(quiz_service, "generate_quizzes_from_contents", fake_generate_batch)
+    yield generated
+    if quiz_service._quiz_cache_db is not None:
+        quiz_service._quiz_cache_db.close()
+
+
+def test_quiz_cache_hit_reissues_question_ids(quiz_cache):
+    first = quiz_service._generate_questions("photosynthesis", "OPTIMAL")
+    second = quiz_service._generate_questions("photosynthesis", "OPTIMAL")
+
+    assert quiz_cache == ["photosynthesis"]
+    assert [q["question"] for q in second] == [q["question"] for q in first]
+    assert {q["id"] for q in second}.isdisjoint(q["id"] for q in first)
+
+
+def test_quiz_cache_is_keyed_by_target_load(quiz_cache):
+    quiz_service._generate_questions("gravity", "OPTIMAL")
+    quiz_service._generate_questions("gravity", "OVERLOAD")
+
+    assert quiz_cache == ["gravity", "gravity"]
+
+
+def test_quiz_cache_shared_with_batch_path(quiz_cache):
+    cached = quiz_service._generate_questions("cells", "LOW")
+
+    batch = quiz_service._generate_questions_batch(["cells", "atoms"], "LOW")
+
+    # Only the lesson missing from the cache is generated
+    assert quiz_cache == ["cells", "atoms"]
+    assert batch[0][0]["question"] == cached[0]["question"]
+    assert batch[0][0]["id"] != cached[0]["id"]
+
+    # And the batch path fills the cache for the single path
+    again = quiz_service._generate_questions("atoms", "LOW")
+    assert quiz_cache == ["cells", "atoms"]
+    assert again[0]["id"] != batch[1][0]["id"]